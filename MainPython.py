@@ -1,56 +1,94 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
+import argparse
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import collections
-import tkinter.font as tkFont
 
 from cards.normal_deck import NormalDeck
 from cards.penalty_deck import PenaltyDeck
 from views.player_setup import PlayerSetupFrame
-from views.game_frame import GameFrame
+from views.history import HistoryView
+from views.perf_overlay import PerfOverlay
+from views.resources import RESOURCES
+from game.engine import GameEngine
+from game.timing import StartupTimer
+from game.perf import PerfMonitor
+from game import events
+
+# PIL, GameFrame ja lokitiedosto tuodaan vasta kun niitä tarvitaan, jotta
+# ensimmäinen ikkuna piirtyy mahdollisimman nopeasti.
+BACKGROUND_PATH = "Images/background.jpg"
+
+class GameApp(tk.Toplevel):
+    """Yksi pelipöytä omassa ikkunassaan.
 
-class GameApp(tk.Tk):
-    def __init__(self):
-        super().__init__()
+    Ikkunat ovat saman piilotetun Tk-juuren alla ja jakavat fontit, teeman
+    ja puretun taustakuvan (views.resources), joten saman prosessin voi
+    ajaa useampaa pöytää, esim. yksi ikkuna per näyttö.
+    """
+
+    def __init__(self, history_lines=500, history_file=None, startup_timer=None,
+                 journal_path=None, resume_game=False, perf_trace_path=None, pack_path=None,
+                 seed=None, shoe_decks=0, shoe_normal=False, reshuffle_at=0.25,
+                 stats_path=None, resources=RESOURCES):
+        self.startup = startup_timer if startup_timer is not None else StartupTimer()
+        self.startup.mark("imports")
+        self.resources = resources
+        self.closed = False
+        super().__init__(resources.acquire())
+        self.perf = PerfMonitor()
         self.title("Homebrew Drinking Game")
         self.geometry("1280x720")
         
         self.base_width = 1920
         self.base_height = 1080
         
-        self.label_font = tkFont.Font(family="Helvetica", size=20, weight="bold")
-        self.sub_label_font = tkFont.Font(family="Helvetica", size=18)
-        self.button_font = tkFont.Font(family="Helvetica", size=16)
-        self.entry_font = tkFont.Font(family="Helvetica", size=16)
-        self.tree_font = tkFont.Font(family="Helvetica", size=16)
-        self.text_font = tkFont.Font(family="Helvetica", size=16)
-        
-        self.style = ttk.Style(self)
-        self.style.theme_use("clam")
-        self.style.configure("TFrame", background="#f0f0f0")
-        self.style.configure("TButton", font=self.button_font)
-        self.style.configure("Accent.TButton", font=self.button_font, foreground="blue")
-        self.style.configure("TLabel", font=self.label_font, background="#f0f0f0")
-        self.style.configure("Treeview", font=self.tree_font)
-        self.style.configure("Treeview.Heading", font=self.tree_font)
-        
-        try:
-            self.original_bg_image = Image.open("Images/background.jpg")
-            self.bg_image = ImageTk.PhotoImage(
-                self.original_bg_image.resize((self.base_width, self.base_height), Image.LANCZOS)
-            )
-            self.canvas = tk.Canvas(self)
-            self.canvas.place(x=0, y=0, relwidth=1, relheight=1)
-            self.canvas_bg = self.canvas.create_image(0, 0, image=self.bg_image, anchor="nw")
-        except Exception as e:
-            print("Background image not found:", e)
-        
-        self.players = []  
-        self.current_player_index = 0
-        self.player_items = {}  
-        
-        self.normal_deck = NormalDeck()
-        self.penalty_deck = PenaltyDeck()
+        # Fontit ja teema ovat yhteisiä kaikille ikkunoille
+        fonts = resources.fonts
+        self.label_font = fonts["label"]
+        self.sub_label_font = fonts["sub_label"]
+        self.button_font = fonts["button"]
+        self.entry_font = fonts["entry"]
+        self.tree_font = fonts["tree"]
+        self.text_font = fonts["text"]
+        self.font_scaler = resources.font_scaler
+        self.style = resources.style
+        
+        # Canvas luodaan heti, jotta se jää muiden widgettien alle; kuva tulee myöhemmin
+        self.canvas = tk.Canvas(self)
+        self.canvas.place(x=0, y=0, relwidth=1, relheight=1)
+        self.load_background(BACKGROUND_PATH)
+        
+        if pack_path:
+            from cards.pack import load_pack
+            pack = load_pack(pack_path)
+            self.engine = GameEngine(pack.normal_deck(), pack.penalty_deck(), pack.items,
+                                     seed=seed)
+        else:
+            self.engine = GameEngine(NormalDeck(), PenaltyDeck(), seed=seed)
+        if shoe_decks:
+            self.engine.use_shoe(shoe_decks, reshuffle_at, normal=shoe_normal)
+        resumed_history = None
+        self.journal = None
+        if journal_path:
+            from game.journal import GameJournal, resume
+            if resume_game and os.path.exists(journal_path):
+                # Tila palautetaan ennen kuuntelijoita, jotta toistoa ei kirjata uudestaan
+                resumed_history = resume(self.engine, journal_path, history_lines)
+            self.journal = GameJournal(journal_path, self.engine, history_lines=history_lines,
+                                       history=resumed_history or (),
+                                       append=resumed_history is not None)
+            self.engine.listeners.append(self.journal.record)
+        self.engine.listeners.append(self.on_game_event)
+        self.stats = None
+        if stats_path:
+            from game.stats import StatsStore
+            self.stats = StatsStore(stats_path)
+            self.engine.listeners.append(self.stats.record)
+        self.normal_deck = self.engine.normal_deck
+        self.penalty_deck = self.engine.penalty_deck
         
         self.container = ttk.Frame(self, padding=10)
         self.container.place(x=0, y=50, relwidth=0.75, relheight=0.85)
@@ -58,11 +96,6 @@ class GameApp(tk.Tk):
         self.container.columnconfigure(0, weight=1)
         
         self.frames = {}
-        for F in (PlayerSetupFrame, GameFrame):
-            page_name = F.__name__
-            frame = F(parent=self.container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
         self.show_frame("PlayerSetupFrame")
         
         self.player_list_frame = ttk.Frame(self, padding=10, relief="ridge")
@@ -80,6 +113,8 @@ class GameApp(tk.Tk):
         self.player_tree.heading("Inventory", text="Inventory", anchor=tk.W)
         self.player_tree.pack(fill="both", expand=True)
         
+        self.tree_rows = {}  # pelaaja -> puussa näkyvä inventaarioteksti
+        
         self.player_tree.bind("<Double-1>", self.on_tree_item_double_click)
         
         self.message_box_frame = ttk.Frame(self, padding=10, relief="ridge")
@@ -93,65 +128,133 @@ class GameApp(tk.Tk):
         self.message_box = tk.Text(self.message_box_frame, state='disabled',
                                    wrap='word', font=self.text_font)
         self.message_box.pack(expand=True, fill="both")
+        sink = None
+        if history_file:
+            from game.history_file import HistoryFileSink
+            sink = HistoryFileSink(history_file)
+        self.history = HistoryView(self.message_box, max_lines=history_lines, sink=sink,
+                                   perf=self.perf)
         
         self.exit_button = ttk.Button(self, text="Exit", command=self.exit_game)
         self.exit_button.place(relx=0.95, rely=0.95, anchor="se")
+        self.protocol("WM_DELETE_WINDOW", self.exit_game)
+        
+        self.perf_trace_path = perf_trace_path
+        self.perf_overlay = PerfOverlay(self, self.perf)
+        self.bind("<F3>", self.perf_overlay.toggle)
+        self.bind("<F4>", self.open_leaderboard)
         
         self.bind("<Configure>", self.on_resize)
+        if resumed_history is not None:
+            self.show_resumed_game(resumed_history)
+        # Siemen näkyy historiassa, jotta bugin voi toistaa --seed-valitsimella
+        self.log_message(f"Game seed: {self.engine.rng.seed}")
+        self.startup.mark("window built")
+        self.after_idle(self.startup.mark, "first paint")
+    
+    def show_resumed_game(self, history):
+        self.update_player_tree()
+        for message in history:
+            self.history.log(message)
+        if self.players and self.engine.current_cards:
+            self.show_frame("GameFrame")
+            self.get_frame("GameFrame").show_current_turn()
+    
+    def load_background(self, path):
+        # Kuva puretaan taustasäikeessä kerran kaikille ikkunoille
+        self.background_path = path
+        self.resources.acquire_image(path, self.show_background)
+    
+    def show_background(self, result):
+        if self.closed:
+            return
+        if isinstance(result, Exception):
+            print("Background image not found:", result)
+            return
+        from views.background import BackgroundScaler
+        self.original_bg_image, preview = result
+        self.canvas_bg = self.canvas.create_image(0, 0, anchor="nw")
+        self.background = BackgroundScaler(self, self.canvas, self.canvas_bg,
+                                           self.original_bg_image, preview=preview)
+        width, height = self.winfo_width(), self.winfo_height()
+        if width < 2 or height < 2:
+            width, height = self.base_width, self.base_height
+        self.background.request(width, height)
+        self.startup.mark("background ready")
     
     def on_resize(self, event):
-        if hasattr(self, "original_bg_image"):
-            width = self.winfo_width()
-            height = self.winfo_height()
-            resized_image = self.original_bg_image.resize((width, height), Image.LANCZOS)
-            self.bg_image = ImageTk.PhotoImage(resized_image)
-            self.canvas.itemconfig(self.canvas_bg, image=self.bg_image)
-        
-        current_width = self.winfo_width()
-        current_height = self.winfo_height()
-        scale_factor = min(current_width / self.base_width, current_height / self.base_height)
-        
-        new_label_size = max(10, int(20 * scale_factor))
-        new_sub_label_size = max(10, int(18 * scale_factor))
-        new_button_size = max(8, int(16 * scale_factor))
-        new_entry_size = max(8, int(16 * scale_factor))
-        new_tree_size = max(8, int(16 * scale_factor))
-        new_text_size = max(8, int(16 * scale_factor))
-        
-        self.label_font.config(size=new_label_size)
-        self.sub_label_font.config(size=new_sub_label_size)
-        self.button_font.config(size=new_button_size)
-        self.entry_font.config(size=new_entry_size)
-        self.tree_font.config(size=new_tree_size)
-        self.text_font.config(size=new_text_size)
+        # <Configure> tulee myös jokaiselta lapsiwidgetiltä; vain ikkunan oma koko kiinnostaa
+        if event.widget is not self:
+            return
+        with self.perf.measure("on_resize"):
+            if hasattr(self, "background"):
+                self.background.request(self.winfo_width(), self.winfo_height())
+            
+            scale_factor = min(self.winfo_width() / self.base_width,
+                               self.winfo_height() / self.base_height)
+            self.font_scaler.request(scale_factor)
+    
+    @property
+    def players(self):
+        return self.engine.players
+    
+    @property
+    def current_player_index(self):
+        return self.engine.current_player_index
+    
+    def on_game_event(self, event, args):
+        message = events.format_event(event, args)
+        if message is not None:
+            self.log_message(message)
+        if event == events.PLAYER_ADDED:
+            self.refresh_player_row(args[0])
+        elif event in (events.ITEM_ADDED, events.ITEM_USED):
+            self.refresh_player_row(args[0])
+    
+    def get_frame(self, page_name):
+        frame = self.frames.get(page_name)
+        if frame is None:
+            if page_name == "GameFrame":
+                from views.game_frame import GameFrame as F
+            else:
+                F = PlayerSetupFrame
+            frame = F(parent=self.container, controller=self)
+            self.frames[page_name] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
+        return frame
     
     def show_frame(self, page_name):
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
         frame.tkraise()
     
     def add_player(self, player_name):
-        if player_name and player_name not in self.players:
-            self.players.append(player_name)
-            self.player_items[player_name] = []  
-            self.update_player_tree()
+        self.engine.add_player(player_name)
     
     def add_item_to_player(self, player, item):
-        if player not in self.player_items:
-            self.player_items[player] = []
-        self.player_items[player].append(item)
-        self.log_message(f"Added item '{item}' to {player}.")
-        self.update_player_tree()
+        self.engine.add_item_to_player(player, item)
     
     def update_player_tree(self):
-        for item in self.player_tree.get_children():
-            self.player_tree.delete(item)
-        for player in self.players:
-            inv = collections.Counter(self.player_items.get(player, []))
+        # Synkronoi puun pelaajalistaan; vain muuttuneet rivit päivitetään
+        with self.perf.measure("update_player_tree"):
+            for player in self.players:
+                self.refresh_player_row(player)
+            current = set(self.players)
+            for player in list(self.tree_rows):
+                if player not in current:
+                    self.player_tree.delete(player)
+                    del self.tree_rows[player]
+    
+    def refresh_player_row(self, player):
+        with self.perf.measure("player_tree_row"):
+            inv = self.engine.inventory.snapshot(player)
             inv_str = ", ".join([f"{k} x{v}" for k, v in inv.items()]) if inv else ""
             if len(inv_str) > 40:
                 inv_str = inv_str[:40] + "..."
-            display = f"{player}{inv_str and ' (' + inv_str + ')'}"
-            self.player_tree.insert("", "end", iid=player, text=player, values=(inv_str,))
+            if player not in self.tree_rows:
+                self.player_tree.insert("", "end", iid=player, text=player, values=(inv_str,))
+            elif self.tree_rows[player] != inv_str:
+                self.player_tree.item(player, values=(inv_str,))
+            self.tree_rows[player] = inv_str
     
     def on_tree_item_double_click(self, event):
         item_id = self.player_tree.focus()
@@ -159,7 +262,7 @@ class GameApp(tk.Tk):
             self.log_message("Only the active player can use items.")
             return
         current_player = self.players[self.current_player_index]
-        inv = collections.Counter(self.player_items.get(current_player, []))
+        inv = self.engine.inventory.snapshot(current_player)
         if not inv:
             messagebox.showinfo("No items", "You have no items to use.")
             return
@@ -179,36 +282,118 @@ class GameApp(tk.Tk):
             btn.pack(pady=5, padx=10, fill="x")
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(pady=10)
     
+    def open_leaderboard(self, event=None):
+        if self.stats is None:
+            messagebox.showinfo("Leaderboard", "Start the game with --stats to keep statistics.")
+            return
+        dialog = tk.Toplevel(self)
+        dialog.transient(self)
+        dialog.geometry("+%d+%d" % (self.winfo_rootx() + 50, self.winfo_rooty() + 50))
+        dialog.title("Leaderboard")
+        for title, stat in (("Most drinks", "drinks"), ("Most given", "given"),
+                            ("Most items used", "items_used"), ("Most Dittos", "dittos")):
+            tk.Label(dialog, text=title, font=self.button_font).pack(pady=(10, 0))
+            rows = self.stats.leaderboard(stat, limit=5)
+            text = "\n".join(f"{rank}. {player}  {value}"
+                             for rank, (player, value) in enumerate(rows, 1))
+            tk.Label(dialog, text=text or "-", font=self.text_font, justify="left").pack(padx=20)
+        ttk.Button(dialog, text="Close", command=dialog.destroy).pack(pady=10)
+    
     def use_item_and_close(self, item, dialog):
         self.use_item(item)
         dialog.destroy()
     
     def use_item(self, item):
-        current_player = self.players[self.current_player_index]
-        if current_player in self.player_items and item in self.player_items[current_player]:
-            self.player_items[current_player].remove(item)
-            self.log_message(f"{current_player} used {item}.")
-            self.update_player_tree()
-        else:
-            self.log_message(f"{current_player} does not have {item}.")
+        self.engine.use_item(item)
     
     def next_player(self):
         if not self.players:
             return
-        self.current_player_index = (self.current_player_index + 1) % len(self.players)
-        self.frames["GameFrame"].update_for_new_turn()
-        self.update_player_tree()
+        with self.perf.measure("next_player"):
+            self.engine.next_player()
+            self.get_frame("GameFrame").update_for_new_turn()
     
     def log_message(self, message):
-        self.message_box.config(state='normal')
-        self.message_box.insert(tk.END, message + "\n")
-        self.message_box.config(state='disabled')
-        self.message_box.see(tk.END)
-        print(message)
+        with self.perf.measure("log_message"):
+            self.history.log(message)
     
     def exit_game(self):
         self.destroy()
+    
+    def destroy(self):
+        # Kutsutaan myös, kun yhteinen juuri tuhotaan; siivous tehdään vain kerran
+        if self.closed:
+            return
+        self.closed = True
+        if self.perf_trace_path:
+            self.perf.export(self.perf_trace_path)
+        self.history.close()
+        if self.journal is not None:
+            self.journal.close()
+        if self.stats is not None:
+            self.stats.close()
+        # Muut ikkunat jatkavat samassa Tk-juuressa, joten omat ajastimet perutaan
+        for frame in self.frames.values():
+            if hasattr(frame, "close"):
+                frame.close()
+        self.perf_overlay.close()
+        if hasattr(self, "background"):
+            self.background.close()
+        self.resources.release_image(self.background_path, self.show_background)
+        super().destroy()
+        self.resources.release()
 
 if __name__ == "__main__":
-    app = GameApp()
+    parser = argparse.ArgumentParser(description="Homebrew Drinking Game")
+    parser.add_argument("--history-lines", type=int, default=500,
+                        help="lines kept in the Card History box")
+    parser.add_argument("--history-file", help="also write the full history to this rotating log file")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each startup step took")
+    parser.add_argument("--startup-budget", type=float, default=1.0,
+                        help="target time to first paint in seconds (default 1.0)")
+    parser.add_argument("--journal", help="record the game to this journal file")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the game recorded in --journal instead of starting over")
+    parser.add_argument("--perf-trace", help="write latency histograms and a trace to this JSON file on exit")
+    parser.add_argument("--pack", help="card pack file to play with (see cards/default.pack)")
+    parser.add_argument("--seed", type=int, help="random seed, to replay a game exactly")
+    parser.add_argument("--shoe", type=int, default=0, metavar="DECKS",
+                        help="deal penalty cards from a shoe of this many decks, without replacement")
+    parser.add_argument("--shoe-normal", action="store_true",
+                        help="deal the hands from a shoe as well")
+    parser.add_argument("--reshuffle-at", type=float, default=0.25,
+                        help="fraction of the shoe left when it is reshuffled (default 0.25)")
+    parser.add_argument("--stats", help="keep player statistics in this SQLite file (F4 shows them)")
+    parser.add_argument("--windows", type=int, default=1,
+                        help="open this many game tables, each in its own window")
+    args = parser.parse_args()
+    timer = StartupTimer(STARTUP_T0, budget=args.startup_budget)
+
+    def window_path(path, n):
+        # Lisäikkunat kirjoittavat omiin tiedostoihinsa: game.hbj -> game-2.hbj
+        if not path or n == 0:
+            return path
+        base, ext = os.path.splitext(path)
+        return f"{base}-{n + 1}{ext}"
+
+    apps = []
+    for n in range(max(1, args.windows)):
+        apps.append(GameApp(history_lines=args.history_lines,
+                            history_file=window_path(args.history_file, n),
+                            startup_timer=timer if n == 0 else None,
+                            journal_path=window_path(args.journal, n), resume_game=args.resume,
+                            perf_trace_path=window_path(args.perf_trace, n), pack_path=args.pack,
+                            seed=None if args.seed is None else args.seed + n,
+                            shoe_decks=args.shoe, shoe_normal=args.shoe_normal,
+                            reshuffle_at=args.reshuffle_at, stats_path=args.stats))
+    app = apps[0]
+    if args.startup_report:
+        # Raportti tulostetaan, kun taustakuva on valmis tai viimeistään 3 s kuluttua
+        def print_report(waited=0):
+            if timer.elapsed("background ready") is None and waited < 3000:
+                app.after(100, print_report, waited + 100)
+            else:
+                print(timer.report())
+        app.after(100, print_report)
     app.mainloop()
@@ -0,0 +1,307 @@
+"""Suorituskykytestit pakoille, vuoroille ja käyttöliittymän kuumille poluille.
+
+    python -m benchmarks.run                   # vertaa tallennettuun baselineen
+    python -m benchmarks.run --save-baseline   # tallentaa nykyiset tulokset
+    xvfb-run python -m benchmarks.run          # myös Tk-testit ilman näyttöä
+
+Tk:ta vaativat testit ohitetaan, jos näyttöä ei ole (--require-display tekee
+ohituksesta virheen). Tulos on mikrosekunteja
+per operaatio (`--rounds` kierroksen mediaani). Baselineen tallennetaan myös
+kierrosten vaihteluväli; jos jokin testi on hitaampi kuin baseline * (1 +
+threshold + kohina), ohjelma palauttaa virhekoodin 1.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from cards.normal_deck import NormalDeck
+from cards.penalty_deck import PenaltyDeck
+from game import engine as rules
+from game.engine import GameEngine
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+BENCHMARKS = []
+
+
+def benchmark(name, needs_tk=False):
+    def register(func):
+        BENCHMARKS.append((name, needs_tk, func))
+        return func
+    return register
+
+
+def measure(func, number, repeat, min_time=0.1):
+    """Toistojen mediaaniaika per kutsu mikrosekunteina.
+
+    Kutsukertoja kasvatetaan, kunnes yksi toisto kestää vähintään
+    `min_time` sekuntia, jotta ajastimen tarkkuus ja lyhyet häiriöt eivät
+    hallitse tulosta. Mediaani kestää yksittäiset hitaat toistot paremmin
+    kuin keskiarvo ja ohimenevät nopeat paremmin kuin minimi.
+    """
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return statistics.median(times) * 1e6
+
+
+@benchmark("deck.draw_cards")
+def bench_draw_cards(repeat):
+    deck = NormalDeck()
+    return measure(lambda: deck.draw_cards(3), 20000, repeat)
+
+
+@benchmark("deck.draw_cards_10k")
+def bench_draw_cards_large(repeat):
+    deck = NormalDeck()
+    for n in range(10000):
+        deck.add_card(f"Custom {n}", weight=random.choice((1, "rare")))
+    return measure(lambda: deck.draw_cards(3), 20000, repeat)
+
+
+@benchmark("deck.draw_penalty_card")
+def bench_draw_penalty(repeat):
+    deck = PenaltyDeck()
+    return measure(deck.draw_penalty_card, 50000, repeat)
+
+
+def play_engine_turn(game):
+    i = int(random.random() * len(game.hand))
+    outcome = game.select_card(i)
+    while outcome not in rules.TURN_ENDING:
+        outcome = game.select_card(i)
+    game.next_player()
+    game.start_turn()
+
+
+@benchmark("engine.turn")
+def bench_engine_turn(repeat):
+    game = GameEngine(seed=1)
+    for n in range(6):
+        game.add_player(f"P{n}")
+    game.start_turn()
+    return measure(lambda: play_engine_turn(game), 20000, repeat)
+
+
+def make_app():
+    import MainPython
+    app = MainPython.GameApp()
+    app.history.echo = False
+    app.update()
+    return app
+
+
+def add_players(app, count):
+    for n in range(count):
+        app.add_player(f"Player {n}")
+    app.history.flush()
+    app.update()
+
+
+@benchmark("ui.turn", needs_tk=True)
+def bench_ui_turn(repeat):
+    app = make_app()
+    add_players(app, 6)
+    frame = app.get_frame("GameFrame")
+    frame.update_for_new_turn()
+
+    def turn():
+        i = app.engine.locked_index
+        if i is None:
+            i = random.randrange(len(app.engine.current_cards))
+        frame.select_card(i)
+        app.update()
+
+    result = measure(turn, 300, repeat)
+    app.destroy()
+    return result
+
+
+def tree_benchmark(players):
+    def run(repeat):
+        app = make_app()
+        add_players(app, players)
+        names = list(app.players)
+
+        def update():
+            app.engine.add_item_to_player(random.choice(names), "Shield")
+            app.update_player_tree()
+            app.update_idletasks()
+
+        result = measure(update, 200, repeat)
+        app.destroy()
+        return result
+    return run
+
+
+for _count in (10, 100, 1000):
+    benchmark(f"ui.update_player_tree_{_count}", needs_tk=True)(tree_benchmark(_count))
+
+
+def log_benchmark(lines):
+    def run(repeat):
+        app = make_app()
+        app.history.max_lines = lines
+        for n in range(lines):
+            app.log_message(f"warm-up line {n}")
+        app.history.flush()
+
+        def log():
+            app.log_message("Player 1 selected Drink 2")
+            app.history.flush()
+            app.update_idletasks()
+
+        result = measure(log, 500, repeat)
+        app.destroy()
+        return result
+    return run
+
+
+for _lines in (1000, 10000):
+    benchmark(f"ui.log_message_{_lines}", needs_tk=True)(log_benchmark(_lines))
+
+
+@benchmark("ui.on_resize_burst", needs_tk=True)
+def bench_resize_burst(repeat):
+    app = make_app()
+
+    class Event:
+        widget = app
+
+    sizes = [(1280 + n * 7, 720 + n * 4) for n in range(30)]
+
+    def burst():
+        # 30 <Configure>-tapahtumaa kuten ikkunaa raahatessa
+        for width, height in sizes:
+            app.geometry(f"{width}x{height}")
+            app.update_idletasks()
+            app.on_resize(Event)
+        app.update()
+
+    result = measure(burst, 5, repeat)
+    app.destroy()
+    return result
+
+
+def has_display():
+    if sys.platform.startswith("win") or sys.platform == "darwin":
+        return True
+    return bool(os.environ.get("DISPLAY"))
+
+
+def spread(values):
+    """Kierrosten vaihteluväli suhteessa mediaaniin, eli mittauksen kohina."""
+    return (max(values) - min(values)) / statistics.median(values)
+
+
+def compare(results, baseline, threshold):
+    """Testi on hidastunut, jos muutos ylittää kynnyksen ja molempien ajojen kohinan.
+
+    results ja baseline ovat muotoa {nimi: {"us": mediaani, "spread": kohina}}.
+    """
+    regressions = []
+    missing = []
+    print(f"{'benchmark':<30} {'us/op':>10} {'baseline':>10} {'change':>8} {'allowed':>8}")
+    for name, result in results.items():
+        value = result["us"]
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<30} {value:10.2f} {'-':>10} {'-':>8} {'-':>8}")
+            missing.append(name)
+            continue
+        allowed = threshold + max(base["spread"], result["spread"])
+        change = (value - base["us"]) / base["us"]
+        flag = ""
+        if change > allowed:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<30} {value:10.2f} {base['us']:10.2f} {change:+8.1%} {allowed:8.0%}{flag}")
+    if missing:
+        print(f"No baseline for {', '.join(missing)}; record one with --save-baseline")
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    # Vanhassa muodossa oli pelkkä aika ilman kohinaa
+    return {name: value if isinstance(value, dict) else {"us": value, "spread": 0.0}
+            for name, value in baseline.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="passes over the whole suite; the median of the passes is reported")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown on top of the measured noise "
+                             "before a benchmark is reported (default 0.2 = 20%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--require-display", action="store_true",
+                        help="fail instead of skipping the Tk benchmarks without a display")
+    args = parser.parse_args(argv)
+
+    random.seed(1)
+    display = has_display()
+    selected = []
+    skipped = []
+    for name, needs_tk, func in BENCHMARKS:
+        if args.only and args.only not in name:
+            continue
+        if needs_tk and not display:
+            print(f"skipping {name}: no display (run under xvfb-run)")
+            skipped.append(name)
+            continue
+        selected.append((name, func))
+    if skipped and args.require_display:
+        print(f"{len(skipped)} Tk benchmark(s) need a display")
+        return 2
+    # Koneen nopeus vaihtelee sekuntien jaksoissa, joten jokainen testi mitataan
+    # useammalla kierroksella koko ajon ajalta eikä yhdellä yhtäjaksoisella mittauksella
+    samples = {name: [] for name, _ in selected}
+    for _ in range(args.rounds):
+        for name, func in selected:
+            samples[name].append(func(args.repeat))
+    results = {name: {"us": statistics.median(values), "spread": spread(values)}
+               for name, values in samples.items()}
+
+    baseline = load_baseline(args.baseline)
+
+    if args.save_baseline:
+        baseline.update({name: {"us": round(r["us"], 3), "spread": round(r["spread"], 3)}
+                         for name, r in results.items()})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved {len(results)} results to {args.baseline}")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than "
+              f"{args.threshold:.0%} plus measurement noise")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
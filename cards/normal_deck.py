@@ -1,37 +1,65 @@
-import random
+import array
 
-class NormalDeck:
+from cards.registry import CARDS
+from cards.weighted import WeightedDeck
+
+class NormalDeck(WeightedDeck):
     def __init__(self):
-        self.cards = [
+        super().__init__([
             "Drink 1",
             "Drink 2",
             "Give 1",
             "Give 3",
             "Crowd Challenge",
             "Surprise Card"
-        ]
+        ])
+        # Nostettaessa kortti vaihtuu toiseksi, esim. Surprise Card -> Drink 5
+        self.transforms = {"Surprise Card": "Drink 5"}
+        # Korttien id:t muunnoksen jälkeen, rakennetaan uudelleen pakan muututtua
+        self.face_ids = None
+        self.face_ids_version = None
     
-    def add_card(self, card_name):
-        if card_name and card_name not in self.cards:
-            self.cards.append(card_name)
+    def add_card(self, card_name, weight=1.0):
+        self.add(card_name, weight)
             
     def remove_card(self, card_name):
-        if card_name in self.cards:
-            self.cards.remove(card_name)
+        self.remove(card_name)
     
+    def hand_indices(self, num):
+        """num kortin indeksit: kengästä peräkkäin tai painotetusti eri kortteja."""
+        if self.shoe is None:
+            return self.sample_distinct_indices(num)
+        if num > len(self.cards):
+            return []
+        next_index = self.shoe.next_index
+        return [next_index() for _ in range(num)]
+
     def draw_cards(self, num):
-        if len(self.cards) >= num:
-            drawn_cards = random.sample(self.cards, num)
+        cards = self.cards
+        drawn_cards = [cards[i] for i in self.hand_indices(num)]
+        if drawn_cards:
             return self.handle_special_cards(drawn_cards)
         return []
     
+    def draw_ids(self, num):
+        """Kuten draw_cards, mutta palauttaa kortti-id:t taulukkona."""
+        if self.face_ids_version != self.version:
+            transforms = self.transforms
+            self.face_ids = CARDS.intern_all(transforms.get(card, card) for card in self.cards)
+            self.face_ids_version = self.version
+        faces = self.face_ids
+        if self.shoe is None:
+            # Yleisin polku suoraan ilman hand_indices-välikutsua
+            return array.array("I", map(faces.__getitem__, self.sample_distinct_indices(num)))
+        return array.array("I", map(faces.__getitem__, self.hand_indices(num)))
+
+    def draw_many(self, hands, num):
+        """Nostaa `hands` kättä kerralla, kukin num eri korttia."""
+        if num > len(self.cards):
+            return []
+        draw_cards = self.draw_cards
+        return [draw_cards(num) for _ in range(hands)]
+    
     def handle_special_cards(self, drawn_cards):
-        transformed_cards = []
-        for card in drawn_cards:
-            if card == "Surprise Card":
-                transformed_cards.append("Drink 5")
-            elif card == "Crowd Challenge":
-                transformed_cards.append("Crowd Challenge")
-            else:
-                transformed_cards.append(card)
-        return transformed_cards
+        transforms = self.transforms
+        return [transforms.get(card, card) for card in drawn_cards]
@@ -0,0 +1,221 @@
+"""Korttipakkojen lataus tekstitiedostosta ja käännetty välimuisti.
+
+Pakkatiedoston muoto:
+
+    # kommentti
+    [normal]
+    Drink 1
+    Drink 2 @ 2                  # paino luku tai harvinaisuus (rare, ...)
+    Surprise Card @ 2 => Drink 5 # nostettaessa kortti vaihtuu toiseksi
+    [penalty]
+    Penalty Drink 1 @ uncommon
+    [items]
+    Shield
+
+Muunnettavan kortin paino kirjoitetaan ennen nuolta (Nimi @ paino => Kohde);
+myös muoto "Nimi => Kohde @ paino" hyväksytään, mutta vain toiselle puolelle.
+
+Käännetty versio (alias-taulukot valmiina) tallennetaan tiedostoon
+<pakka>.packcache, ja sitä käytetään niin kauan kuin lähdetiedoston
+muokkausaika ja koko ovat samat. Välimuisti on pelkkää dataa, ei picklea,
+joten muokattu tiedosto voi korkeintaan hylätä välimuistin:
+
+    b"HBPC" | versio u32 | mtime_ns i64 | koko i64
+    | normal-pakka | penalty-pakka | esineet | muunnokset
+
+Pakka on kortit (u32 määrä + u32 pituus + UTF-8 kullekin) ja sen jälkeen
+painot, prob ja alias muodossa u32 määrä + arrayn raakatavut. Esineet ovat
+samanlainen merkkijonolista ja muunnokset lista pareittain (nimi, kohde).
+"""
+import array
+import os
+import struct
+
+from cards.normal_deck import NormalDeck
+from cards.penalty_deck import PenaltyDeck
+from cards.weighted import RARITIES, WeightedDeck
+
+CACHE_MAGIC = b"HBPC"
+CACHE_VERSION = 4
+SECTIONS = ("normal", "penalty", "items")
+
+CACHE_HEADER = struct.Struct("<4sIqq")
+U32 = struct.Struct("<I")
+ARRAY_TYPES = ("d", "d", "l")  # painot, prob, alias
+
+
+class CardPack:
+    def __init__(self, normal, penalty, items, transforms):
+        # normal ja penalty ovat (kortit, painot, prob, alias) -nelikoita
+        self.normal = normal
+        self.penalty = penalty
+        self.items = tuple(items)
+        self.transforms = dict(transforms)
+
+    def normal_deck(self):
+        deck = NormalDeck()
+        deck.load(*self.normal)
+        deck.transforms = dict(self.transforms)
+        return deck
+
+    def penalty_deck(self):
+        deck = PenaltyDeck()
+        deck.load(*self.penalty)
+        return deck
+
+
+def parse_weight(text, path, lineno):
+    text = text.strip()
+    if text in RARITIES:
+        return RARITIES[text]
+    try:
+        weight = float(text)
+    except ValueError:
+        raise ValueError(f"{path}:{lineno}: unknown weight {text!r}") from None
+    if weight <= 0:
+        raise ValueError(f"{path}:{lineno}: weight must be positive")
+    return weight
+
+
+def parse_pack(path):
+    cards = {name: {} for name in SECTIONS}  # osio -> {kortti: paino}
+    transforms = {}
+    section = None
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                section = line[1:-1].strip().lower()
+                if section not in SECTIONS:
+                    raise ValueError(f"{path}:{lineno}: unknown section [{section}]")
+                continue
+            if section is None:
+                raise ValueError(f"{path}:{lineno}: card outside of a section")
+            line, _, target = line.partition("=>")
+            name, _, weight = line.partition("@")
+            target, _, target_weight = target.partition("@")
+            if weight and target_weight:
+                raise ValueError(f"{path}:{lineno}: weight given on both sides of =>")
+            weight = weight or target_weight
+            name = name.strip()
+            if not name:
+                raise ValueError(f"{path}:{lineno}: missing card name")
+            cards[section][name] = parse_weight(weight, path, lineno) if weight else 1.0
+            if target.strip():
+                if section != "normal":
+                    raise ValueError(f"{path}:{lineno}: only normal cards can be transformed")
+                transforms[name] = target.strip()
+    return cards, transforms
+
+
+def compile_deck(weighted_cards):
+    deck = WeightedDeck()
+    deck.load(weighted_cards.keys(), weighted_cards.values())
+    if deck.cards:
+        deck.build_alias()
+    # Numerot tallennetaan array-muodossa: välimuisti on pienempi ja latautuu nopeammin
+    return (deck.cards, array.array("d", deck.weights),
+            array.array("d", deck.prob or ()), array.array("l", deck.alias or ()))
+
+
+def compile_pack(path):
+    cards, transforms = parse_pack(path)
+    return CardPack(compile_deck(cards["normal"]), compile_deck(cards["penalty"]),
+                    cards["items"].keys(), transforms)
+
+
+def encode_strings(strings):
+    parts = [U32.pack(len(strings))]
+    for s in strings:
+        data = s.encode("utf-8")
+        parts.append(U32.pack(len(data)) + data)
+    return b"".join(parts)
+
+
+def encode_pack(key, pack):
+    parts = [CACHE_HEADER.pack(CACHE_MAGIC, *key)]
+    for cards, *arrays in (pack.normal, pack.penalty):
+        parts.append(encode_strings(cards))
+        for values in arrays:
+            parts.append(U32.pack(len(values)) + values.tobytes())
+    parts.append(encode_strings(pack.items))
+    parts.append(encode_strings([s for pair in pack.transforms.items() for s in pair]))
+    return b"".join(parts)
+
+
+def read_strings(data, pos):
+    (count,) = U32.unpack_from(data, pos)
+    pos += 4
+    strings = []
+    for _ in range(count):
+        (length,) = U32.unpack_from(data, pos)
+        pos += 4
+        if pos + length > len(data):
+            raise ValueError("truncated cache")
+        strings.append(data[pos:pos + length].decode("utf-8"))
+        pos += length
+    return strings, pos
+
+
+def read_array(data, pos, typecode):
+    (count,) = U32.unpack_from(data, pos)
+    pos += 4
+    values = array.array(typecode)
+    end = pos + count * values.itemsize
+    if end > len(data):
+        raise ValueError("truncated cache")
+    values.frombytes(data[pos:end])
+    return values, end
+
+
+def decode_pack(data, key):
+    """Purkaa välimuistin; palauttaa None, jos se on toiselle lähteelle tai versiolle."""
+    magic, *cached_key = CACHE_HEADER.unpack_from(data, 0)
+    if magic != CACHE_MAGIC or tuple(cached_key) != key:
+        return None
+    pos = CACHE_HEADER.size
+    decks = []
+    for _ in range(2):
+        cards, pos = read_strings(data, pos)
+        arrays = []
+        for typecode in ARRAY_TYPES:
+            values, pos = read_array(data, pos, typecode)
+            arrays.append(values)
+        weights, prob, alias = arrays
+        if len(weights) != len(cards) or len(prob) != len(alias) or len(prob) not in (0, len(cards)):
+            raise ValueError("inconsistent deck in cache")
+        if alias and not (0 <= min(alias) and max(alias) < len(cards)):
+            raise ValueError("alias out of range in cache")
+        decks.append((cards, weights, prob, alias))
+    items, pos = read_strings(data, pos)
+    pairs, pos = read_strings(data, pos)
+    if pos != len(data) or len(pairs) % 2:
+        raise ValueError("corrupt cache")
+    return CardPack(decks[0], decks[1], items, zip(pairs[::2], pairs[1::2]))
+
+
+def load_pack(path, use_cache=True):
+    """Lataa pakan; käyttää välimuistia, jos se vastaa lähdetiedostoa."""
+    stat = os.stat(path)
+    key = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cache_path = path + "cache" if path.endswith(".pack") else path + ".packcache"
+    if use_cache:
+        try:
+            with open(cache_path, "rb") as f:
+                pack = decode_pack(f.read(), key)
+            if pack is not None:
+                return pack
+        except (OSError, struct.error, ValueError):
+            pass  # rikkinäinen välimuisti käännetään uudelleen
+    pack = compile_pack(path)
+    if use_cache:
+        tmp = cache_path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(encode_pack(key, pack))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass  # välimuisti on vain nopeutus
+    return pack
@@ -1,22 +1,27 @@
-import random
+from cards.weighted import WeightedDeck
 
-class PenaltyDeck:
+class PenaltyDeck(WeightedDeck):
     def __init__(self):
-        self.cards = [
+        super().__init__([
             "Penalty Drink 1",
             "Penalty Drink 2",
             "Penalty Drink 3"
-        ]
+        ])
     
-    def add_penalty_card(self, card_name):
-        if card_name and card_name not in self.cards:
-            self.cards.append(card_name)
+    def add_penalty_card(self, card_name, weight=1.0):
+        self.add(card_name, weight)
     
     def remove_penalty_card(self, card_name):
-        if card_name in self.cards:
-            self.cards.remove(card_name)
+        self.remove(card_name)
     
     def draw_penalty_card(self):
-        if self.cards:
-            return random.choice(self.cards)
-        return None
+        if self.shoe is not None:
+            i = self.shoe.next_index()
+            return None if i is None else self.cards[i]
+        return self.sample()
+    
+    def draw_many(self, num):
+        if not self.cards:
+            return []
+        draw = self.draw_penalty_card
+        return [draw() for _ in range(num)]
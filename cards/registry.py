@@ -0,0 +1,47 @@
+import array
+
+
+class CardRegistry:
+    """Korttien nimet pieninä kokonaislukuina.
+
+    Pelin tila (kädet, esineet) käsittelee vain id:itä; nimi haetaan
+    vasta kun se näytetään tai tallennetaan. Sama nimi saa aina saman
+    id:n, joten vertailut ovat kokonaislukuvertailuja.
+    """
+
+    __slots__ = ("ids", "names")
+
+    def __init__(self, names=()):
+        self.ids = {}
+        self.names = []
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        card_id = self.ids.get(name)
+        if card_id is None:
+            card_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return card_id
+
+    def lookup(self, name):
+        """id tai None, jos nimeä ei ole koskaan nähty."""
+        return self.ids.get(name)
+
+    def name(self, card_id):
+        return self.names[card_id]
+
+    def intern_all(self, names):
+        intern = self.intern
+        return array.array("I", [intern(name) for name in names])
+
+    def names_of(self, card_ids):
+        names = self.names
+        return [names[i] for i in card_ids]
+
+
+# Prosessin yhteinen rekisteri: kaikki pakat ja pelit käyttävät samoja id:itä
+CARDS = CardRegistry()
@@ -0,0 +1,73 @@
+import array
+
+
+class Shoe:
+    """Pakan kortit sekoitettuna taulukkoon, josta nostetaan järjestyksessä.
+
+    Nosto vain siirtää kursoria (O(1)), eikä sama kortti tule uudelleen
+    ennen sekoitusta. Taulukon alku order[:cursor] on poistopino. Kun
+    kengästä on nostettu kaikki paitsi `reshuffle_at`-osuus, poistopino
+    sekoitetaan takaisin. Kengässä on `decks` pakkaa, ja kortin
+    kopiomäärä pakkaa kohden on sen paino suhteessa kevyimpään korttiin
+    (pyöristettynä), joten rare-kortit ovat kengässä harvinaisempia.
+    """
+
+    def __init__(self, deck, decks=1, reshuffle_at=0.25):
+        if decks < 1:
+            raise ValueError(f"a shoe needs at least one deck, got {decks}")
+        if not 0 <= reshuffle_at < 1:
+            raise ValueError(f"reshuffle_at must be in [0, 1), got {reshuffle_at}")
+        self.deck = deck
+        self.decks = decks
+        self.reshuffle_at = reshuffle_at
+        self.order = array.array("I")  # pakan korttien indeksejä
+        self.cursor = 0
+        self.cut = 0
+        self.shuffles = 0
+        self.version = None  # pakan versio, josta kenkä on rakennettu
+
+    def __len__(self):
+        self.sync()
+        return len(self.order)
+
+    def sync(self):
+        """Rakentaa kengän uudelleen, jos pakkaa on muutettu."""
+        if self.version == self.deck.version:
+            return
+        weights = self.deck.weights
+        lightest = min(weights) if len(weights) else 1.0
+        order = array.array("I")
+        for i, weight in enumerate(weights):
+            order.extend([i] * (max(1, round(weight / lightest)) * self.decks))
+        self.order = order
+        self.version = self.deck.version
+        self.shuffle()
+
+    def shuffle(self):
+        self.deck.rng.shuffle(self.order)
+        self.cursor = 0
+        self.cut = len(self.order) - int(len(self.order) * self.reshuffle_at)
+        self.shuffles += 1
+
+    def next_index(self):
+        """Seuraavan kortin indeksi pakassa, tai None tyhjästä pakasta."""
+        if self.version != self.deck.version:
+            self.sync()
+        if self.cursor >= self.cut:
+            if not self.order:
+                return None
+            self.shuffle()
+        i = self.order[self.cursor]
+        self.cursor += 1
+        return i
+
+    def remaining(self):
+        """Kortit, jotka voi nostaa ennen seuraavaa sekoitusta."""
+        self.sync()
+        return self.cut - self.cursor
+
+    def discards(self):
+        """Poistopinon kortit nostojärjestyksessä."""
+        self.sync()
+        cards = self.deck.cards
+        return [cards[i] for i in self.order[:self.cursor]]
@@ -0,0 +1,170 @@
+import array
+import random
+
+from cards.shoe import Shoe
+
+# Harvinaisuudet painoina; add-metodeille voi antaa joko luvun tai nimen
+RARITIES = {
+    "common": 1.0,
+    "uncommon": 0.5,
+    "rare": 0.2,
+    "legendary": 0.05,
+}
+
+
+def copy_numbers(values):
+    if isinstance(values, array.array):
+        return array.array(values.typecode, values)
+    return list(values)
+
+
+class WeightedDeck:
+    """Korttipakka, jossa jokaisella kortilla on paino.
+
+    Jäsenyys tarkistetaan sanakirjasta ja poisto vaihtaa viimeisen kortin
+    poistettavan paikalle, joten molemmat ovat O(1). Painotettu nosto
+    tehdään alias-taulukolla (Vose), joka rakennetaan uudelleen vasta
+    seuraavassa nostossa pakan muututtua.
+    """
+
+    def __init__(self, cards=()):
+        # Mikä tahansa olio, jolla on random() ja choices() (esim. GameRandom)
+        self.rng = random
+        self.cards = []
+        self.weights = []
+        self.positions = {}
+        self.alias = None
+        self.prob = None
+        # Kasvaa jokaisesta muutoksesta (esim. valmiiksi jaettujen käsien mitätöintiin)
+        self.version = 0
+        # Kun kenkä on käytössä, nostot tehdään siitä ilman takaisinpanoa
+        self.shoe = None
+        for card in cards:
+            self.add(card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __contains__(self, card_name):
+        return card_name in self.positions
+
+    def add(self, card_name, weight=1.0):
+        if not card_name or card_name in self.positions:
+            return False
+        weight = RARITIES[weight] if isinstance(weight, str) else float(weight)
+        if weight <= 0:
+            raise ValueError(f"card weight must be positive, got {weight}")
+        self.positions[card_name] = len(self.cards)
+        self.cards.append(card_name)
+        self.weights.append(weight)
+        self.alias = None
+        self.version += 1
+        return True
+
+    def remove(self, card_name):
+        i = self.positions.pop(card_name, None)
+        if i is None:
+            return False
+        last_card = self.cards.pop()
+        last_weight = self.weights.pop()
+        if i < len(self.cards):
+            self.cards[i] = last_card
+            self.weights[i] = last_weight
+            self.positions[last_card] = i
+        self.alias = None
+        self.version += 1
+        return True
+
+    def weight(self, card_name):
+        return self.weights[self.positions[card_name]]
+
+    def build_alias(self):
+        n = len(self.weights)
+        total = sum(self.weights)
+        scaled = [w * n / total for w in self.weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        self.prob = prob
+        self.alias = alias
+
+    def sample_index(self):
+        if self.alias is None:
+            self.build_alias()
+        u = self.rng.random() * len(self.cards)
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def use_shoe(self, decks=1, reshuffle_at=0.25):
+        """Ottaa kengän käyttöön (ks. cards.shoe); decks=0 palauttaa painotetun arvonnan."""
+        self.shoe = Shoe(self, decks, reshuffle_at) if decks else None
+
+    def cards_remaining(self):
+        """Kengässä jäljellä olevat kortit ennen sekoitusta, tai None ilman kenkää."""
+        return self.shoe.remaining() if self.shoe is not None else None
+
+    def sample(self):
+        """Yksi painotettu kortti takaisinpanolla, tai None tyhjästä pakasta."""
+        if not self.cards:
+            return None
+        return self.cards[self.sample_index()]
+
+    def load(self, cards, weights, prob=None, alias=None):
+        """Korvaa pakan sisällön; valmiit alias-taulukot voi antaa mukana."""
+        # array-muotoiset taulukot (esim. käännetystä pakasta) kopioidaan muistikopiona
+        self.cards = list(cards)
+        self.weights = copy_numbers(weights)
+        self.positions = dict(zip(self.cards, range(len(self.cards))))
+        self.prob = copy_numbers(prob) if prob is not None else None
+        self.alias = copy_numbers(alias) if alias is not None else None
+        self.version += 1
+
+    def sample_distinct(self, num):
+        """num eri korttia painotetusti ilman takaisinpanoa."""
+        cards = self.cards
+        return [cards[i] for i in self.sample_distinct_indices(num)]
+
+    def sample_distinct_indices(self, num):
+        n = len(self.cards)
+        if num > n:
+            return []
+        if self.alias is None:
+            self.build_alias()
+        picked = []
+        if num * 2 <= n:
+            # Pieni nosto isosta pakasta: hylätään toistot. Kun painot ovat
+            # hyvin vinot, toistoja voi tulla paljon, joten yritykset rajataan.
+            rand = self.rng.random
+            prob = self.prob
+            alias = self.alias
+            for _ in range(num * 20):
+                u = rand() * n
+                i = int(u)
+                if u - i >= prob[i]:
+                    i = alias[i]
+                if i not in picked:
+                    picked.append(i)
+                    if len(picked) == num:
+                        return picked
+        # Muuten nostetaan loput yksi kerrallaan jäljellä olevista
+        indices = [i for i in range(n) if i not in picked]
+        weights = [self.weights[i] for i in indices]
+        while len(picked) < num:
+            k = self.rng.choices(range(len(indices)), weights)[0]
+            picked.append(indices[k])
+            indices[k] = indices[-1]
+            weights[k] = weights[-1]
+            indices.pop()
+            weights.pop()
+        return picked
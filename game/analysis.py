@@ -0,0 +1,196 @@
+"""Vuoron tulosten tarkat todennäköisyydet ilman simulointia.
+
+Esimerkki:
+    python -m game.analysis --pack cards/default.pack --redraw-chance 0.05
+
+Oletuksena pelaaja klikkaa satunnaista korttia (kuten simulaattorin
+RandomBot). Käsi nostetaan painotetusti ilman takaisinpanoa, joten kortin
+todennäköisyys olla kädessä lasketaan painoluokittain: samanpainoiset
+kortit ovat keskenään symmetrisiä, joten työ riippuu eri painojen
+määrästä eikä pakan koosta.
+"""
+import argparse
+import collections
+import re
+import time
+
+from game.engine import GameEngine
+
+DRINK_PATTERN = re.compile(r"^(?:Penalty )?Drink (\d+)$")
+GIVE_PATTERN = re.compile(r"^Give (\d+)$")
+
+
+def card_drinks(card):
+    """Palauttaa (itse juotavat, jaettavat) kortin nimestä, esim. 'Give 3' -> (0, 3)."""
+    match = DRINK_PATTERN.match(card)
+    if match:
+        return int(match.group(1)), 0
+    match = GIVE_PATTERN.match(card)
+    if match:
+        return 0, int(match.group(1))
+    return 0, 0
+
+
+def inclusion_probabilities(weights, hand_size):
+    """Todennäköisyys, että kukin kortti on `hand_size` kortin kädessä.
+
+    Nosto on sama kuin WeightedDeck.sample_distinct: seuraava kortti
+    valitaan painojen suhteessa jäljellä olevista. Tila on jo nostettujen
+    painoluokkien monijoukko, joten tiloja on enintään m^(k-1), kun m on
+    eri painojen määrä.
+    """
+    counts = collections.Counter(weights)
+    classes = list(counts)
+    sizes = [counts[w] for w in classes]
+    total = sum(w * n for w, n in zip(classes, sizes))
+    m = len(classes)
+
+    expected = [0.0] * m  # luokan korttien odotettu määrä kädessä
+    sized = [w * n for w, n in zip(classes, sizes)]
+    states = {(): 1.0}
+    for position in range(hand_size):
+        # Viimeisen paikan tiloja ei yhdistetä sanakirjaan: niiden osuus
+        # lasketaan suoraan edellisen tason tiloista, mikä on selvästi nopeampaa.
+        final = position == hand_size - 2
+        acc = 0.0
+        correction = [0.0] * m
+        last_acc = 0.0
+        last_correction = [0.0] * m
+        next_states = collections.defaultdict(float)
+        for state, p in states.items():
+            rest = total - sum(classes[c] for c in state)
+            r = p / rest
+            acc += r
+            for c in state:
+                correction[c] += r
+            if position == hand_size - 1:
+                continue
+            branch = sized[:]
+            for c in state:
+                branch[c] -= classes[c]
+            if final:
+                subtotal = 0.0
+                for c, b in enumerate(branch):
+                    if b:
+                        t = r * b / (rest - classes[c])
+                        subtotal += t
+                        last_correction[c] += t
+                last_acc += subtotal
+                for c in state:
+                    last_correction[c] += subtotal
+            else:
+                for c, b in enumerate(branch):
+                    if b:
+                        next_states[tuple(sorted(state + (c,)))] += r * b
+        for c in range(m):
+            expected[c] += classes[c] * (sizes[c] * acc - correction[c])
+        if final:
+            for c in range(m):
+                expected[c] += classes[c] * (sizes[c] * last_acc - last_correction[c])
+            break
+        states = next_states
+
+    per_card = {w: expected[c] / sizes[c] for c, w in enumerate(classes)}
+    return [per_card[w] for w in weights]
+
+
+class OutcomeAnalysis:
+    """Yhden vuoron tulosjakauma pelin nykyisistä pakoista ja asetuksista.
+
+    Kaikki todennäköisyydet ovat vuoroa kohden; `redraw_chance` on
+    todennäköisyys, että pelaaja ottaa penaltynoston ennen valintaa.
+    Give-kortit oletetaan jaettavan tasan muille, joten ne lasketaan
+    mukaan pelaajakohtaisiin juomiin.
+    """
+
+    def __init__(self, game, redraw_chance=0.0):
+        started = time.perf_counter()
+        normal = game.normal_deck
+        hand_size = game.HAND_SIZE
+        if len(normal) < hand_size:
+            raise ValueError(f"normal deck needs at least {hand_size} cards, has {len(normal)}")
+        items = game.ITEM_CARDS
+        item_chance = game.ITEM_CHANCE if items else 0.0
+        self.redraw_chance = redraw_chance
+
+        self.outcomes = {
+            "item": item_chance,
+            "ditto": (1 - item_chance) * game.DITTO_CHANCE,
+            "selected": (1 - item_chance) * (1 - game.DITTO_CHANCE),
+        }
+        # Valittu kortti on satunnainen paikka kädestä: P(kortti) = P(kädessä) / k
+        faces = collections.defaultdict(float)
+        transforms = getattr(normal, "transforms", {})
+        selected = self.outcomes["selected"]
+        for card, p in zip(normal.cards, inclusion_probabilities(normal.weights, hand_size)):
+            faces[transforms.get(card, card)] += selected * p / hand_size
+        self.faces = dict(faces)
+        self.items = {item: item_chance / len(items) for item in items}
+
+        penalty = game.penalty_deck
+        penalty_total = sum(penalty.weights)
+        self.penalties = {card: w / penalty_total
+                          for card, w in zip(penalty.cards, penalty.weights)}
+
+        self.drinks = sum(p * card_drinks(face)[0] for face, p in self.faces.items())
+        self.gives = sum(p * card_drinks(face)[1] for face, p in self.faces.items())
+        self.penalty_drinks = sum(p * card_drinks(card)[0] for card, p in self.penalties.items())
+        self.elapsed = time.perf_counter() - started
+
+    @property
+    def drinks_per_turn(self):
+        """Odotetut juomat pelaajaa kohden yhtä omaa vuoroa kohden."""
+        return self.drinks + self.gives + self.redraw_chance * self.penalty_drinks
+
+    @property
+    def turns_per_item(self):
+        rate = self.outcomes["item"]
+        return 1 / rate if rate else float("inf")
+
+    def as_dict(self):
+        return {
+            "outcomes": dict(self.outcomes),
+            "faces": dict(self.faces),
+            "items": dict(self.items),
+            "penalties": dict(self.penalties),
+            "drinks_per_turn": self.drinks_per_turn,
+            "turns_per_item": self.turns_per_item,
+        }
+
+    def summary(self):
+        lines = [f"{name:<22} {p:8.2%}" for name, p in self.outcomes.items()]
+        lines.append("")
+        for face, p in sorted(self.faces.items(), key=lambda kv: -kv[1]):
+            lines.append(f"{face:<22} {p:8.2%}")
+        lines.append("")
+        for card, p in sorted(self.penalties.items(), key=lambda kv: -kv[1]):
+            lines.append(f"{card:<22} {p:8.2%} per penalty")
+        lines.append("")
+        lines.append(f"{'own drinks':<22} {self.drinks:8.3f} per turn")
+        lines.append(f"{'given drinks':<22} {self.gives:8.3f} per turn")
+        lines.append(f"{'penalty drinks':<22} {self.penalty_drinks:8.3f} per penalty")
+        lines.append(f"{'drinks per player':<22} {self.drinks_per_turn:8.3f} per own turn")
+        lines.append(f"{'turns per item':<22} {self.turns_per_item:8.2f}")
+        return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact turn outcome probabilities.")
+    parser.add_argument("--pack", help="card pack file (see cards/default.pack)")
+    parser.add_argument("--redraw-chance", type=float, default=0.0,
+                        help="probability of a penalty redraw before picking")
+    args = parser.parse_args(argv)
+
+    if args.pack:
+        from cards.pack import load_pack
+        pack = load_pack(args.pack)
+        game = GameEngine(pack.normal_deck(), pack.penalty_deck(), pack.items, seed=0)
+    else:
+        game = GameEngine(seed=0)
+    analysis = OutcomeAnalysis(game, args.redraw_chance)
+    print("\n".join(analysis.summary()))
+    print(f"\n{len(game.normal_deck)} cards analysed in {analysis.elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+import collections
+
+from cards.normal_deck import NormalDeck
+from cards.penalty_deck import PenaltyDeck
+from cards.registry import CARDS
+from game import events
+from game.hand import Hand
+from game.inventory import Inventory
+from game.rng import GameRandom
+
+# select_card-paluuarvot
+REVEALED = "revealed"
+DITTO = "ditto"
+DITTO_CONFIRMED = "ditto_confirmed"
+ITEM = "item"
+SELECTED = "selected"
+
+# Näiden jälkeen vuoro vaihtuu seuraavalle pelaajalle
+TURN_ENDING = frozenset((DITTO_CONFIRMED, ITEM, SELECTED))
+
+
+class GameEngine:
+    """Pelin säännöt ja tila ilman käyttöliittymää.
+
+    Käyttöliittymä (tai simulaattori) kuuntelee tapahtumia lisäämällä
+    funktion listeners-listaan; se kutsutaan muodossa listener(event, args).
+    Sisäisesti kortit ovat rekisterin id:itä (cards.registry); tapahtumissa,
+    tilannekuvissa ja näkymille ne ovat nimiä.
+    """
+
+    ITEM_CARDS = ("Shield", "Reveal Free", "Extra Life", "test1", "test2")
+    HAND_SIZE = 3
+    ITEM_CHANCE = 0.3
+    DITTO_CHANCE = 0.25
+
+    def __init__(self, normal_deck=None, penalty_deck=None, item_cards=None, seed=None, rng=None):
+        self.normal_deck = normal_deck if normal_deck is not None else NormalDeck()
+        self.penalty_deck = penalty_deck if penalty_deck is not None else PenaltyDeck()
+        # Kaikki satunnaisuus johdetaan yhdestä siemenestä. Kädet jaetaan omasta
+        # lähteestään, jotta ennakkoon valmistellut kädet eivät muuta muuta
+        # satunnaisuutta sen mukaan, ehtikö esihaku ajaa ennen klikkausta.
+        self.rng = rng if rng is not None else GameRandom(seed)
+        self.deal_rng = GameRandom(self.rng.generator.getrandbits(32))
+        self.normal_deck.rng = self.deal_rng
+        self.penalty_deck.rng = self.rng
+        if item_cards is not None:
+            self.ITEM_CARDS = tuple(item_cards)
+        self.item_ids = CARDS.intern_all(self.ITEM_CARDS)
+        self.item_set = frozenset(self.item_ids)
+        self.listeners = []
+
+        self.players = []
+        self.current_player_index = 0
+        self.inventory = Inventory()
+
+        # Vuoron tila
+        self.hand = Hand()
+        self.redraw_used = False
+
+        # Valmiiksi jaetut kädet: (pakan versio, kortit, piilotettu indeksi)
+        self.prepared = collections.deque()
+
+    def emit(self, event, *args):
+        for listener in self.listeners:
+            listener(event, args)
+
+    @property
+    def current_cards(self):
+        return CARDS.names_of(self.hand.cards)
+
+    @property
+    def hidden_index(self):
+        return self.hand.hidden if self.hand.cards else None
+
+    @property
+    def revealed(self):
+        return [self.hand.is_revealed(i) for i in range(len(self.hand))]
+
+    @property
+    def ditto_active(self):
+        return [self.hand.is_ditto(i) for i in range(len(self.hand))]
+
+    @property
+    def locked_index(self):
+        locked = self.hand.locked
+        return None if locked < 0 else locked
+
+    @property
+    def current_player(self):
+        if not self.players:
+            return None
+        return self.players[self.current_player_index]
+
+    def add_player(self, player_name):
+        if player_name and player_name not in self.players:
+            self.players.append(player_name)
+            self.inventory.add_player(player_name)
+            self.emit(events.PLAYER_ADDED, player_name)
+            return True
+        return False
+
+    def add_item_to_player(self, player, item):
+        self.inventory.add(player, CARDS.intern(item))
+        self.emit(events.ITEM_ADDED, player, item)
+
+    def use_item(self, item):
+        current_player = self.current_player
+        if self.inventory.consume(current_player, CARDS.lookup(item)):
+            self.emit(events.ITEM_USED, current_player, item)
+            return True
+        self.emit(events.ITEM_MISSING, current_player, item)
+        return False
+
+    def next_player(self):
+        if not self.players:
+            return None
+        self.current_player_index = (self.current_player_index + 1) % len(self.players)
+        return self.players[self.current_player_index]
+
+    def make_hand(self):
+        """Arpoo uuden käden muuttamatta pelin tilaa. Palauttaa (kortti-id:t, piilotettu)."""
+        # Simulaatiossa tämä on vuoron kallein osa (~4,5 µs),
+        # joten choice/randint korvataan suoraan random():lla.
+        rand = self.deal_rng.random
+        hand_size = self.HAND_SIZE
+        cards = self.normal_deck.draw_ids(hand_size)
+        items = self.item_ids
+        if items:
+            chance = self.ITEM_CHANCE
+            item_count = len(items)
+            for i in range(len(cards)):
+                if rand() < chance:
+                    cards[i] = items[int(rand() * item_count)]
+        return cards, int(rand() * hand_size)
+
+    def prefetch(self, count=2):
+        """Jakaa valmiiksi `count` seuraavaa kättä (seuraava vuoro ja penaltynosto).
+
+        Käyttöliittymä kutsuu tätä joutoaikana, jolloin vuoron vaihto vain
+        ottaa valmiin käden jonosta. Kädet käytetään jakojärjestyksessä,
+        joten siemen toistaa saman pelin esihausta riippumatta. Kengästä
+        jaettaessa ei esihaeta, koska ennakkoon nostetut kortit näkyisivät
+        kengän laskurissa ja aikaistaisivat sekoitusta.
+        """
+        if self.normal_deck.shoe is not None:
+            return
+        prepared = self.prepared
+        version = self.normal_deck.version
+        if prepared and prepared[0][0] != version:
+            prepared.clear()  # pakkaa on muutettu, vanhat kädet eivät kelpaa
+        while len(prepared) < count:
+            prepared.append((version,) + self.make_hand())
+
+    def discard_prepared(self):
+        self.prepared.clear()
+
+    def use_shoe(self, decks=1, reshuffle_at=0.25, normal=False):
+        """Penaltykortit (ja halutessa kädet) nostetaan kengästä ilman takaisinpanoa."""
+        self.penalty_deck.use_shoe(decks, reshuffle_at)
+        if normal:
+            self.normal_deck.use_shoe(decks, reshuffle_at)
+            self.prepared.clear()
+
+    def deal(self):
+        """Yhteinen jakopolku vuoroille ja penaltynostoille."""
+        prepared = self.prepared
+        if prepared and prepared[0][0] == self.normal_deck.version:
+            _, cards, hidden = prepared.popleft()
+        else:
+            prepared.clear()
+            cards, hidden = self.make_hand()
+        self.hand = Hand(cards, hidden)
+        if self.listeners:
+            self.emit(events.CARDS_DEALT, self.current_player,
+                      tuple(CARDS.names_of(cards)), hidden)
+
+    def start_turn(self):
+        self.redraw_used = False
+        if self.listeners:
+            self.emit(events.TURN_STARTED, self.current_player)
+        self.deal()
+
+    def card_face(self, i):
+        """Kortin näkyvä teksti: '???' piilotetulle, 'Ditto' aktiiviselle Dittolle."""
+        hand = self.hand
+        if not hand.revealed >> i & 1:
+            return "???"
+        if hand.ditto >> i & 1:
+            return "Ditto"
+        return CARDS.names[hand.cards[i]]
+
+    def select_card(self, i):
+        """Käsittelee klikkauksen korttiin i ja palauttaa tuloksen (tai None).
+
+        Jos tulos on TURN_ENDING-joukossa, kutsujan pitää vaihtaa vuoroa.
+        """
+        hand = self.hand
+        if i >= len(hand.cards):
+            return None
+        if hand.locked >= 0 and hand.locked != i:
+            return None
+        # Simulaatiossa kuuntelijoita ei ole, jolloin tapahtumien argumentteja ei koota
+        listening = bool(self.listeners)
+        bit = 1 << i
+
+        if not hand.revealed & bit:
+            hand.revealed |= bit
+            hand.locked = i
+            if listening:
+                self.emit(events.CARD_REVEALED, self.current_player, i,
+                          CARDS.names[hand.cards[i]])
+            return REVEALED
+
+        if hand.ditto & bit:
+            hand.ditto &= ~bit
+            if listening:
+                self.emit(events.DITTO_CONFIRMED, self.current_player)
+            return DITTO_CONFIRMED
+
+        card = hand.cards[i]
+        if card in self.item_set:
+            current_player = self.players[self.current_player_index]
+            if listening:
+                name = CARDS.names[card]
+                self.emit(events.ITEM_ACQUIRED, current_player, name)
+            self.inventory.add(current_player, card)
+            if listening:
+                self.emit(events.ITEM_ADDED, current_player, name)
+            return ITEM
+
+        # Ditto-efekti 25 % todennäköisyydellä
+        if self.rng.random() < self.DITTO_CHANCE:
+            hand.ditto |= bit
+            hand.locked = i
+            if listening:
+                self.emit(events.DITTO_ACTIVATED, self.current_player, i)
+            return DITTO
+
+        if listening:
+            self.emit(events.CARD_SELECTED, self.current_player, CARDS.names[card])
+        return SELECTED
+
+    def roll_penalty(self):
+        p = self.penalty_deck.draw_penalty_card()
+        if p:
+            self.emit(events.PENALTY_ROLLED, self.current_player, p)
+        return p
+
+    def redraw_penalty(self):
+        """Nostaa penaltykortin ja jakaa uudet kortit. Palauttaa (ok, penaltykortti)."""
+        if self.redraw_used:
+            self.emit(events.REDRAW_REFUSED)
+            return False, None
+
+        p = self.penalty_deck.draw_penalty_card()
+        if p:
+            self.emit(events.PENALTY_REDRAWN, self.current_player, p)
+        self.redraw_used = True
+        self.emit(events.HAND_REDRAWN, self.current_player)
+        self.deal()
+        return True, p
+
+    def crowd_challenge(self):
+        self.emit(events.CROWD_CHALLENGE)
+
+    def snapshot(self):
+        """Koko pelin tila tavallisina tietorakenteina (tallennusta varten)."""
+        return {
+            "players": list(self.players),
+            "current_player_index": self.current_player_index,
+            "inventory": {p: self.inventory.snapshot(p) for p in self.inventory.stock},
+            "current_cards": list(self.current_cards),
+            "hidden_index": self.hidden_index,
+            "revealed": list(self.revealed),
+            "ditto_active": list(self.ditto_active),
+            "locked_index": self.locked_index,
+            "redraw_used": self.redraw_used,
+            "normal_deck": [list(self.normal_deck.cards), list(self.normal_deck.weights)],
+            "penalty_deck": [list(self.penalty_deck.cards), list(self.penalty_deck.weights)],
+        }
+
+    def restore(self, state):
+        self.prepared.clear()
+        self.players = list(state["players"])
+        self.current_player_index = state["current_player_index"]
+        self.inventory = Inventory()
+        for player, items in state["inventory"].items():
+            self.inventory.add_player(player)
+            for item, count in items.items():
+                self.inventory.add(player, CARDS.intern(item), count)
+        hand = Hand(CARDS.intern_all(state["current_cards"]), state["hidden_index"] or 0)
+        hand.revealed = sum(1 << i for i, shown in enumerate(state["revealed"]) if shown)
+        hand.ditto = sum(1 << i for i, active in enumerate(state["ditto_active"]) if active)
+        if state["locked_index"] is not None:
+            hand.locked = state["locked_index"]
+        self.hand = hand
+        self.redraw_used = state["redraw_used"]
+        for deck, (cards, weights) in ((self.normal_deck, state["normal_deck"]),
+                                       (self.penalty_deck, state["penalty_deck"])):
+            for card in list(deck.cards):
+                deck.remove(card)
+            for card, weight in zip(cards, weights):
+                deck.add(card, weight)
+
+    def apply_event(self, event, args):
+        """Toistaa tallennetun tapahtuman tilaan ilman satunnaisuutta tai kuuntelijoita."""
+        if event == events.PLAYER_ADDED:
+            self.players.append(args[0])
+            self.inventory.add_player(args[0])
+        elif event == events.TURN_STARTED:
+            self.current_player_index = self.players.index(args[0])
+            self.redraw_used = False
+        elif event == events.HAND_REDRAWN:
+            self.redraw_used = True
+        elif event == events.CARDS_DEALT:
+            _, cards, hidden = args
+            self.hand = Hand(CARDS.intern_all(cards), hidden)
+        elif event == events.CARD_REVEALED:
+            self.hand.revealed |= 1 << args[1]
+            self.hand.locked = args[1]
+        elif event == events.DITTO_ACTIVATED:
+            self.hand.ditto |= 1 << args[1]
+            self.hand.locked = args[1]
+        elif event == events.DITTO_CONFIRMED:
+            self.hand.ditto = 0
+        elif event == events.ITEM_ADDED:
+            self.inventory.add(args[0], CARDS.intern(args[1]))
+        elif event == events.ITEM_USED:
+            self.inventory.consume(args[0], CARDS.lookup(args[1]))
@@ -0,0 +1,38 @@
+PLAYER_ADDED = "player_added"
+TURN_STARTED = "turn_started"
+CARDS_DEALT = "cards_dealt"
+HAND_REDRAWN = "hand_redrawn"
+CARD_REVEALED = "card_revealed"
+CARD_SELECTED = "card_selected"
+DITTO_ACTIVATED = "ditto_activated"
+DITTO_CONFIRMED = "ditto_confirmed"
+ITEM_ACQUIRED = "item_acquired"
+ITEM_ADDED = "item_added"
+ITEM_USED = "item_used"
+ITEM_MISSING = "item_missing"
+PENALTY_ROLLED = "penalty_rolled"
+PENALTY_REDRAWN = "penalty_redrawn"
+REDRAW_REFUSED = "redraw_refused"
+CROWD_CHALLENGE = "crowd_challenge"
+
+# Card Historyyn kirjattavat viestit. Tapahtumat, joita ei ole tässä, eivät näy lokissa.
+MESSAGES = {
+    CARD_SELECTED: "{0} selected {1}",
+    DITTO_ACTIVATED: "Ditto effect activated! Click again to confirm.",
+    DITTO_CONFIRMED: "{0} confirmed Ditto card.",
+    ITEM_ACQUIRED: "{0} acquired item: {1}",
+    ITEM_ADDED: "Added item '{1}' to {0}.",
+    ITEM_USED: "{0} used {1}.",
+    ITEM_MISSING: "{0} does not have {1}.",
+    PENALTY_ROLLED: "{0} rolled penalty card: {1}",
+    PENALTY_REDRAWN: "{0} drew penalty card: {1}",
+    REDRAW_REFUSED: "Redraw is already used this turn.",
+    CROWD_CHALLENGE: "Crowd Challenge triggered! All players must do something special!",
+}
+
+
+def format_event(event, args):
+    template = MESSAGES.get(event)
+    if template is None:
+        return None
+    return template.format(*args)
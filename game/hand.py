@@ -0,0 +1,30 @@
+import array
+
+
+class Hand:
+    """Yhden vuoron kortit ja tila muutamana kokonaislukuna.
+
+    cards on kortti-id:iden taulukko (cards.registry). revealed ja ditto
+    ovat bittimaskeja, joissa bitti i kuvaa korttia i. locked on -1, kun
+    mitään korttia ei ole lukittu.
+    """
+
+    __slots__ = ("cards", "hidden", "revealed", "ditto", "locked")
+
+    def __init__(self, cards=(), hidden=0):
+        if not isinstance(cards, array.array):
+            cards = array.array("I", cards)
+        self.cards = cards
+        self.hidden = hidden
+        self.revealed = ((1 << len(cards)) - 1) & ~(1 << hidden) if cards else 0
+        self.ditto = 0
+        self.locked = -1
+
+    def __len__(self):
+        return len(self.cards)
+
+    def is_revealed(self, i):
+        return self.revealed >> i & 1 == 1
+
+    def is_ditto(self, i):
+        return self.ditto >> i & 1 == 1
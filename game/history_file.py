@@ -0,0 +1,31 @@
+import logging
+import logging.handlers
+import queue
+
+
+class HistoryFileSink:
+    """Kirjoittaa pelihistorian kiertävään tiedostoon taustasäikeessä.
+
+    write() vain laittaa rivit jonoon, joten Tk-säie ei koskaan odota
+    levyä. Kun tiedosto kasvaa yli `max_bytes`, se kierrätetään
+    (history.log -> history.log.1 ...), ja vanhimmat poistetaan.
+    """
+
+    def __init__(self, path, max_bytes=1024 * 1024, backup_count=5):
+        self.queue = queue.SimpleQueue()
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.listener = logging.handlers.QueueListener(self.queue, handler)
+        self.listener.start()
+
+    def write(self, messages):
+        for message in messages:
+            self.queue.put(logging.makeLogRecord({"msg": message, "levelno": logging.INFO,
+                                                  "levelname": "INFO"}))
+
+    def close(self):
+        # Odottaa, että jono on kirjoitettu, ja sulkee tiedoston
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
@@ -0,0 +1,62 @@
+import array
+
+from cards.registry import CARDS
+
+
+class Inventory:
+    """Pelaajien esineet taulukoina: pelaaja -> array määriä esinepaikoittain.
+
+    Esine on kortti-id (cards.registry). Jokainen erilainen esine saa
+    paikan ensimmäisellä lisäyskerralla, ja pelaajan taulukko kasvaa vasta
+    kun siihen lisätään uuden paikan esine. Lisäys, käyttö ja laskenta
+    ovat vakioaikaisia, eikä muisti riipu kerättyjen esineiden määrästä.
+    """
+
+    def __init__(self):
+        self.slots = {}  # kortti-id -> paikka
+        self.items = array.array("I")  # paikka -> kortti-id
+        self.stock = {}
+
+    def __contains__(self, player):
+        return player in self.stock
+
+    def add_player(self, player):
+        if player not in self.stock:
+            self.stock[player] = array.array("I")
+
+    def add(self, player, item, count=1):
+        slot = self.slots.get(item)
+        if slot is None:
+            slot = self.slots[item] = len(self.items)
+            self.items.append(item)
+        counts = self.stock.get(player)
+        if counts is None:
+            counts = self.stock[player] = array.array("I")
+        if slot >= len(counts):
+            counts.extend([0] * (slot + 1 - len(counts)))
+        counts[slot] += count
+
+    def consume(self, player, item):
+        slot = self.slots.get(item)
+        counts = self.stock.get(player)
+        if slot is None or counts is None or slot >= len(counts) or not counts[slot]:
+            return False
+        counts[slot] -= 1
+        return True
+
+    def count(self, player, item):
+        slot = self.slots.get(item)
+        counts = self.stock.get(player)
+        if slot is None or counts is None or slot >= len(counts):
+            return 0
+        return counts[slot]
+
+    def total(self, player):
+        counts = self.stock.get(player)
+        return sum(counts) if counts else 0
+
+    def snapshot(self, player):
+        """Kopio pelaajan esineistä ({esineen nimi: määrä}) näkymiä varten."""
+        names = CARDS.names
+        items = self.items
+        return {names[items[slot]]: n for slot, n in enumerate(self.stock.get(player, ())) if n}
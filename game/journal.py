@@ -0,0 +1,233 @@
+"""Pelin tapahtumaloki (journal) ja tilannekuvat keskeytyneen pelin jatkamiseen.
+
+Journal on binääritiedosto, johon jokainen tilaa muuttava tapahtuma
+lisätään peräkkäin:
+
+    b"HBJ1" | (tapahtumakoodi u8, argumenttien määrä u8, argumentit)*
+
+Argumentti on tyyppitavu ja data: b"s" + u16 pituus + UTF-8,
+b"i" + i32 tai b"t" + u16 määrä + merkkijonot. Joka `snapshot_every`
+tapahtuman välein koko tila kirjoitetaan erilliseen tiedostoon
+(<journal>.snap) yhdessä journalin sen hetkisen pituuden kanssa, joten
+jatkaminen lukee vain tilannekuvan ja sen jälkeen tulleen lopun.
+Kirjoitus tapahtuu taustasäikeessä, joten Tk-säie ei odota levyä.
+"""
+import collections
+import json
+import os
+import queue
+import struct
+import threading
+
+from game import events
+
+MAGIC = b"HBJ1"
+
+# Tapahtumat, jotka muuttavat pelin tilaa tai näkyvät historiassa.
+# Koodi on indeksi tässä listassa, joten uudet tapahtumat lisätään loppuun.
+JOURNALED = [
+    events.PLAYER_ADDED,
+    events.TURN_STARTED,
+    events.CARDS_DEALT,
+    events.HAND_REDRAWN,
+    events.CARD_REVEALED,
+    events.CARD_SELECTED,
+    events.DITTO_ACTIVATED,
+    events.DITTO_CONFIRMED,
+    events.ITEM_ACQUIRED,
+    events.ITEM_ADDED,
+    events.ITEM_USED,
+    events.PENALTY_ROLLED,
+    events.PENALTY_REDRAWN,
+]
+CODES = {event: code for code, event in enumerate(JOURNALED)}
+
+U16 = struct.Struct("<H")
+I32 = struct.Struct("<i")
+HEADER = struct.Struct("<BB")
+
+
+def encode_event(event, args):
+    parts = [HEADER.pack(CODES[event], len(args))]
+    for arg in args:
+        if isinstance(arg, int):
+            parts.append(b"i" + I32.pack(arg))
+        elif isinstance(arg, (tuple, list)):
+            parts.append(b"t" + U16.pack(len(arg)))
+            for s in arg:
+                data = s.encode("utf-8")
+                parts.append(U16.pack(len(data)) + data)
+        else:
+            data = str(arg).encode("utf-8")
+            parts.append(b"s" + U16.pack(len(data)) + data)
+    return b"".join(parts)
+
+
+def read_string(data, pos):
+    (length,) = U16.unpack_from(data, pos)
+    pos += 2
+    return data[pos:pos + length].decode("utf-8"), pos + length
+
+
+def decode_events(data, pos=0):
+    """Purkaa tapahtumat tavuista alkaen kohdasta pos. Katkennut loppu ohitetaan.
+
+    Palauttaa (tapahtumat, viimeisen ehjän tietueen loppukohta).
+    """
+    decoded = []
+    end = pos
+    try:
+        while pos < len(data):
+            code, argc = HEADER.unpack_from(data, pos)
+            pos += HEADER.size
+            args = []
+            for _ in range(argc):
+                tag = data[pos:pos + 1]
+                pos += 1
+                if tag == b"i":
+                    args.append(I32.unpack_from(data, pos)[0])
+                    pos += 4
+                elif tag == b"t":
+                    (count,) = U16.unpack_from(data, pos)
+                    pos += 2
+                    items = []
+                    for _ in range(count):
+                        s, pos = read_string(data, pos)
+                        items.append(s)
+                    args.append(tuple(items))
+                elif tag == b"s":
+                    s, pos = read_string(data, pos)
+                    args.append(s)
+                else:
+                    raise ValueError(f"bad argument tag {tag!r}")
+            if pos > len(data):
+                break
+            decoded.append((JOURNALED[code], tuple(args)))
+            end = pos
+    except (struct.error, IndexError, UnicodeDecodeError, ValueError):
+        # Kaatumisessa viimeinen tietue on voinut jäädä kesken
+        pass
+    return decoded, end
+
+
+class GameJournal:
+    """Kuuntelee GameEnginen tapahtumia ja kirjoittaa ne journaliin.
+
+    Lisätään kuuntelijaksi: engine.listeners.append(journal.record).
+    """
+
+    def __init__(self, path, engine, snapshot_every=1000, history_lines=500, history=(),
+                 append=False):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.engine = engine
+        self.snapshot_every = snapshot_every
+        self.history = collections.deque(history, maxlen=history_lines)
+        self.since_snapshot = 0
+        self.queue = queue.SimpleQueue()
+
+        if not append:
+            # Uusi peli: vanha journal ja tilannekuva korvataan
+            for old in (path, self.snapshot_path):
+                if os.path.exists(old):
+                    os.remove(old)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "ab")
+        if new_file:
+            self.file.write(MAGIC)
+        elif append:
+            # Kaatumisessa kesken jäänyt tietue katkaistaan pois, ettei uusia
+            # tapahtumia kirjoiteta rikkinäisten tavujen perään. Tilannekuva
+            # kirjoitetaan heti, koska vanhan kuvan kohta voi olla katkaisun takana.
+            end = load_journal(path)[3]
+            self.file.truncate(end)
+            self.file.seek(end)  # tell() antaa tilannekuvan kohdan
+            self.snapshot()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def record(self, event, args):
+        code = CODES.get(event)
+        if code is None:
+            return
+        message = events.format_event(event, args)
+        if message is not None:
+            self.history.append(message)
+        self.queue.put(encode_event(event, args))
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        # Tila kopioidaan Tk-säikeessä, jotta se vastaa jonon tätä kohtaa
+        self.since_snapshot = 0
+        self.queue.put({"state": self.engine.snapshot(), "history": list(self.history)})
+
+    def write_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if isinstance(item, bytes):
+                if item:
+                    self.file.write(item)
+                if not item or self.queue.empty():
+                    # Jonon tyhjennyttyä tapahtumat viedään käyttöjärjestelmälle,
+                    # jotta kaatuminen ei vie puskurillista tapahtumia
+                    self.file.flush()
+                continue
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            item["offset"] = self.file.tell()
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(item, f, separators=(",", ":"))
+            os.replace(tmp, self.snapshot_path)
+        self.file.close()
+
+    def flush(self):
+        """Kirjoittaa tapahtumat levylle (ilman tilannekuvaa)."""
+        self.queue.put(b"")
+
+    def close(self):
+        self.snapshot()
+        self.queue.put(None)
+        self.thread.join()
+
+
+def load_journal(path):
+    """Palauttaa (tila tai None, historia, tapahtumat tilannekuvan jälkeen,
+    viimeisen ehjän tietueen loppukohta tiedostossa)."""
+    state = None
+    history = []
+    offset = len(MAGIC)
+    snapshot_path = path + ".snap"
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, encoding="utf-8") as f:
+            snap = json.load(f)
+        state = snap["state"]
+        history = snap["history"]
+        offset = snap["offset"]
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a game journal")
+        # Tilannekuvan kohta voi olla tiedoston lopun takana, jos loppu katosi kaatumisessa
+        offset = min(offset, os.fstat(f.fileno()).st_size)
+        f.seek(offset)
+        tail = f.read()
+    decoded, end = decode_events(tail)
+    return state, history, decoded, offset + end
+
+
+def resume(engine, path, history_lines=500):
+    """Palauttaa pelin journalista engineen ja palauttaa historian rivit."""
+    state, history, tail, _ = load_journal(path)
+    if state is not None:
+        engine.restore(state)
+    history = collections.deque(history, maxlen=history_lines)
+    for event, args in tail:
+        engine.apply_event(event, args)
+        message = events.format_event(event, args)
+        if message is not None:
+            history.append(message)
+    return list(history)
@@ -0,0 +1,103 @@
+import collections
+import json
+import time
+
+# Histogrammin lokeroiden ylärajat millisekunteina
+BUCKETS_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000, float("inf"))
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        i = 0
+        while ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, fraction):
+        """Lokeron yläraja, jonka alle `fraction` mittauksista osuu (max viimeiselle)."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for limit, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(limit, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {("inf" if limit == float("inf") else str(limit)): n
+                        for limit, n in zip(BUCKETS_MS, self.counts)},
+        }
+
+
+class PerfMonitor:
+    """Kuumien polkujen ajanotto: histogrammit nimittäin ja rajattu trace-lista.
+
+    export() kirjoittaa JSON-tiedoston, jonka "traceEvents" aukeaa
+    sellaisenaan Chromen chrome://tracing- tai Perfetto-näkymässä.
+    """
+
+    def __init__(self, trace_limit=50000):
+        self.start = time.perf_counter()
+        self.histograms = collections.defaultdict(Histogram)
+        self.trace = collections.deque(maxlen=trace_limit)
+
+    def record(self, name, started, duration):
+        self.histograms[name].add(duration * 1000)
+        self.trace.append((name, started, duration))
+
+    def measure(self, name):
+        return Measurement(self, name)
+
+    def summary(self):
+        lines = []
+        for name in sorted(self.histograms):
+            h = self.histograms[name]
+            lines.append(f"{name:<22} p50 {h.percentile(0.5):6.1f}  p95 {h.percentile(0.95):6.1f}"
+                         f"  max {h.max:7.1f} ms  n={h.count}")
+        return lines
+
+    def export(self, path):
+        data = {
+            "histograms": {name: h.as_dict() for name, h in self.histograms.items()},
+            "traceEvents": [
+                {"name": name, "ph": "X", "pid": 1, "tid": 1,
+                 "ts": (started - self.start) * 1e6, "dur": duration * 1e6}
+                for name, started, duration in self.trace
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+
+class Measurement:
+    __slots__ = ("monitor", "name", "started")
+
+    def __init__(self, monitor, name):
+        self.monitor = monitor
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.monitor.record(self.name, self.started, time.perf_counter() - self.started)
+        return False
@@ -0,0 +1,162 @@
+"""Pelin ajaminen ilman käyttöliittymää.
+
+Esimerkkejä:
+    python -m game.simulate --players 6 --turns 1000000 --seed 1
+    python -m game.simulate --script peli.txt --verbose
+
+Skriptitiedostossa on yksi komento per rivi:
+    add <nimi>      lisää pelaaja
+    select <0-2>    klikkaa korttia
+    roll            nosta penaltykortti
+    redraw          penalty + uudet kortit
+    use <esine>     käytä esine
+Tyhjät rivit ja #-alkuiset rivit ohitetaan.
+"""
+import argparse
+import sys
+import time
+
+from game import engine as rules
+from game.engine import GameEngine
+from game.events import format_event
+
+TURN_ENDING = rules.TURN_ENDING
+
+
+def print_listener(event, args):
+    message = format_event(event, args)
+    if message is not None:
+        print(message)
+
+
+class RandomBot:
+    """Klikkaa satunnaista korttia ja käyttää välillä esineitä tai redrawta."""
+
+    def __init__(self, redraw_chance=0.05, use_item_chance=0.1):
+        self.redraw_chance = redraw_chance
+        self.use_item_chance = use_item_chance
+
+    def play_turn(self, game):
+        rand = game.rng.random
+        if rand() < self.use_item_chance:
+            for item in game.inventory.snapshot(game.current_player):
+                game.use_item(item)
+                break
+        if rand() < self.redraw_chance:
+            game.redraw_penalty()
+        cards = game.hand.cards
+        if not cards:
+            return None
+        i = int(rand() * len(cards))
+        select_card = game.select_card
+        outcome = select_card(i)
+        while outcome not in TURN_ENDING:
+            outcome = select_card(i)
+        return outcome
+
+
+def run_bot_game(game, bot, turns):
+    """Pelaa annetun määrän vuoroja ja palauttaa tulosten lukumäärät."""
+    counts = dict.fromkeys(rules.TURN_ENDING, 0)
+    play_turn = bot.play_turn
+    start_turn = game.start_turn
+    next_player = game.next_player
+    start_turn()
+    for _ in range(turns):
+        outcome = play_turn(game)
+        if outcome is None:
+            break
+        counts[outcome] += 1
+        next_player()
+        start_turn()
+    return counts
+
+
+def run_script(game, lines):
+    started = False
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        command, _, arg = line.partition(" ")
+        arg = arg.strip()
+        if command == "add":
+            game.add_player(arg)
+            continue
+        if not game.players:
+            raise ValueError(f"line {lineno}: add players before '{command}'")
+        if not started:
+            game.start_turn()
+            started = True
+        if command == "select":
+            outcome = game.select_card(int(arg))
+            if outcome in rules.TURN_ENDING:
+                game.next_player()
+                game.start_turn()
+        elif command == "roll":
+            game.roll_penalty()
+        elif command == "redraw":
+            game.redraw_penalty()
+        elif command == "use":
+            game.use_item(arg)
+        else:
+            raise ValueError(f"line {lineno}: unknown command '{command}'")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the drinking game without a display.")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--script", help="file with scripted commands ('-' for stdin)")
+    parser.add_argument("--pack", help="card pack file (see cards/default.pack)")
+    parser.add_argument("--shoe", type=int, default=0, metavar="DECKS",
+                        help="deal penalty cards from a shoe of this many decks")
+    parser.add_argument("--shoe-normal", action="store_true", help="deal the hands from a shoe as well")
+    parser.add_argument("--reshuffle-at", type=float, default=0.25)
+    parser.add_argument("--stats", help="add the results to this player statistics database")
+    parser.add_argument("--verbose", action="store_true", help="print the card history")
+    args = parser.parse_args(argv)
+
+    if args.pack:
+        from cards.pack import load_pack
+        pack = load_pack(args.pack)
+        game = GameEngine(pack.normal_deck(), pack.penalty_deck(), pack.items, seed=args.seed)
+    else:
+        game = GameEngine(seed=args.seed)
+    if args.shoe:
+        game.use_shoe(args.shoe, args.reshuffle_at, normal=args.shoe_normal)
+    if args.verbose:
+        game.listeners.append(print_listener)
+    stats = None
+    if args.stats:
+        from game.stats import StatsStore
+        stats = StatsStore(args.stats)
+        game.listeners.append(stats.record)
+
+    if args.script:
+        if args.script == "-":
+            run_script(game, sys.stdin)
+        else:
+            with open(args.script, encoding="utf-8") as f:
+                run_script(game, f)
+    else:
+        for n in range(args.players):
+            game.add_player(f"Bot {n + 1}")
+        start = time.perf_counter()
+        counts = run_bot_game(game, RandomBot(), args.turns)
+        elapsed = time.perf_counter() - start
+        played = sum(counts.values())
+        print(f"seed {game.rng.seed}")
+        print(f"{played} turns in {elapsed:.3f} s ({played / elapsed:,.0f} turns/s)")
+        for outcome, n in sorted(counts.items()):
+            print(f"  {outcome}: {n}")
+
+    for player in game.players:
+        print(f"{player}: {game.inventory.total(player)} items")
+    if stats is not None:
+        stats.close()
+
+
+if __name__ == "__main__":
+    main()
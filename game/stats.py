@@ -0,0 +1,259 @@
+"""Pelaajakohtaiset tilastot, jotka säilyvät pelikerrasta toiseen.
+
+Esimerkki:
+    python MainPython.py --stats stats.sqlite
+    python -m game.stats stats.sqlite --stat drinks
+
+Tilastot kerätään samoista tapahtumista kuin Card History. Jokainen
+tapahtuma päivittää vain muistissa olevia laskureita; muutokset
+kirjoitetaan SQLiteen erissä taustasäikeessä yhtenä transaktiona.
+Taulussa on yksi rivi per (pelaaja, tilasto), ja (tilasto, arvo)
+-indeksin ansiosta kärkilista on yksi indeksihaku.
+"""
+import argparse
+import collections
+import queue
+import sqlite3
+import sys
+import threading
+
+from game import events
+from game.analysis import card_drinks
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_stats (
+    player TEXT NOT NULL,
+    stat TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (player, stat)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS player_stats_by_value ON player_stats (stat, value DESC);
+"""
+
+UPSERT = """
+INSERT INTO player_stats (player, stat, value) VALUES (?, ?, ?)
+ON CONFLICT (player, stat) DO UPDATE SET value = value + excluded.value
+"""
+
+# Tilastot, joita kärkilistassa voi kysyä (esinekohtaiset ovat muotoa "used:Shield")
+STATS = ("sessions", "turns", "selected", "drinks", "given", "penalties", "redraws",
+         "dittos", "items_acquired", "items_used")
+
+
+class StatsStore:
+    """Kuuntelee GameEnginen tapahtumia ja päivittää pelaajien tilastot.
+
+    Lisätään kuuntelijaksi: engine.listeners.append(stats.record).
+    Muutokset lähetetään kirjoittajasäikeelle `flush_every` tapahtuman
+    välein; kirjoittajasäie hakee ne itse, jos jonoon ei ole tullut mitään
+    `flush_interval` sekuntiin. Kyselyt eivät odota kirjoituksia, vaan
+    lisäävät tietokannan riveihin vielä kirjoittamattomat muutokset.
+    """
+
+    def __init__(self, path, flush_every=200, flush_interval=2.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = {}  # (pelaaja, tilasto) -> kirjoittamaton muutos
+        self.pending_events = 0
+        self.pending_lock = threading.Lock()
+        self.unwritten = collections.deque()  # kirjoittajalle annetut, kommitoimattomat erät
+        self.drinks = {}  # kortti -> (juomat, jaettavat), jäsennetään kerran per kortti
+        self.write_failed = False
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self.lock = threading.Lock()  # yhteys ja unwritten-jonon purku
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def add(self, player, stat, amount=1):
+        key = (player, stat)
+        self.pending[key] = self.pending.get(key, 0) + amount
+
+    def card_drinks(self, card):
+        drinks = self.drinks.get(card)
+        if drinks is None:
+            drinks = self.drinks[card] = card_drinks(card)
+        return drinks
+
+    def record(self, event, args):
+        handler = self.handlers.get(event)
+        if handler is None:
+            return
+        with self.pending_lock:
+            handler(self, *args)
+            self.pending_events += 1
+            full = self.pending_events >= self.flush_every
+        if full:
+            self.flush()
+
+    def on_selected(self, player, card):
+        drinks, given = self.card_drinks(card)
+        self.add(player, "selected")
+        if drinks:
+            self.add(player, "drinks", drinks)
+        if given:
+            self.add(player, "given", given)
+
+    def on_penalty(self, player, card):
+        self.add(player, "penalties")
+        drinks = self.card_drinks(card)[0]
+        if drinks:
+            self.add(player, "drinks", drinks)
+
+    def on_redraw(self, player, card):
+        self.add(player, "redraws")
+        self.on_penalty(player, card)
+
+    def on_item_acquired(self, player, item):
+        self.add(player, "items_acquired")
+        self.add(player, "acquired:" + item)
+
+    def on_item_used(self, player, item):
+        self.add(player, "items_used")
+        self.add(player, "used:" + item)
+
+    handlers = {
+        events.CARD_SELECTED: on_selected,
+        events.TURN_STARTED: lambda self, player: self.add(player, "turns"),
+        events.PENALTY_ROLLED: on_penalty,
+        events.PENALTY_REDRAWN: on_redraw,
+        events.ITEM_ACQUIRED: on_item_acquired,
+        events.ITEM_USED: on_item_used,
+        events.DITTO_CONFIRMED: lambda self, player: self.add(player, "dittos"),
+        events.PLAYER_ADDED: lambda self, player: self.add(player, "sessions"),
+    }
+
+    def flush(self):
+        """Lähettää kertyneet muutokset kirjoittajasäikeelle."""
+        with self.pending_lock:
+            batch = self.pending
+            if not batch:
+                return
+            self.pending = {}
+            self.pending_events = 0
+            self.unwritten.append(batch)
+        self.queue.put(batch)
+
+    def write_loop(self):
+        while True:
+            try:
+                batch = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Hiljainen hetki: kertyneet muutokset kirjoitetaan ajastimella
+                self.flush()
+                continue
+            if batch is None:
+                self.queue.task_done()
+                break
+            try:
+                self.write(batch)
+            finally:
+                # Muuten sync() odottaisi ikuisesti
+                self.queue.task_done()
+
+    def write(self, batch):
+        rows = [(player, stat, value) for (player, stat), value in batch.items()]
+        with self.lock:
+            self.unwritten.popleft()
+            try:
+                with self.connection:
+                    self.connection.executemany(UPSERT, rows)
+            except sqlite3.Error as e:
+                # Esim. lukittu tai täysi levy: erä palautetaan odottamaan seuraavaa
+                # flushia, jolloin kirjoitusta yritetään uudelleen eivätkä
+                # kyselyt menetä sen muutoksia.
+                with self.pending_lock:
+                    for key, value in batch.items():
+                        self.pending[key] = self.pending.get(key, 0) + value
+                if not self.write_failed:
+                    print(f"Could not save statistics to {self.path}: {e}", file=sys.stderr)
+                self.write_failed = True
+                return
+        self.write_failed = False
+
+    def unwritten_changes(self):
+        """Kaikki kirjoittamattomat muutokset; kutsutaan self.lockin alla."""
+        with self.pending_lock:
+            batches = list(self.unwritten)
+            batches.append(dict(self.pending))
+        changes = {}
+        for batch in batches:
+            for key, value in batch.items():
+                changes[key] = changes.get(key, 0) + value
+        return changes
+
+    def sync(self):
+        """Odottaa, että kaikki muutokset on kirjoitettu tai kirjoitus on epäonnistunut.
+
+        Epäonnistunut erä jää odottamaan seuraavaa yritystä, ja kyselyt näkevät
+        sen muutokset edelleen.
+        """
+        self.flush()
+        self.queue.join()
+
+    def leaderboard(self, stat="drinks", limit=10):
+        """[(pelaaja, arvo), ...] suurimmasta pienimpään kaikista pelikerroista."""
+        with self.lock:
+            changes = {p: v for (p, s), v in self.unwritten_changes().items() if s == stat}
+            values = dict(self.connection.execute(
+                "SELECT player, value FROM player_stats WHERE stat = ? "
+                "ORDER BY value DESC, player LIMIT ?", (stat, limit)))
+            # Tilastot vain kasvavat, joten kärkeen voi nousta vain muuttunut pelaaja
+            missing = [p for p in changes if p not in values]
+            if missing:
+                values.update(self.connection.execute(
+                    "SELECT player, value FROM player_stats WHERE stat = ? AND player IN "
+                    f"({', '.join('?' * len(missing))})", (stat, *missing)))
+        for player, value in changes.items():
+            values[player] = values.get(player, 0) + value
+        return sorted(values.items(), key=lambda pv: (-pv[1], pv[0]))[:limit]
+
+    def player(self, player):
+        """Pelaajan kaikki tilastot {tilasto: arvo}."""
+        with self.lock:
+            changes = self.unwritten_changes()
+            stats = dict(self.connection.execute(
+                "SELECT stat, value FROM player_stats WHERE player = ?", (player,)))
+        for (p, stat), value in changes.items():
+            if p == player:
+                stats[stat] = stats.get(stat, 0) + value
+        return stats
+
+    def total(self, stat):
+        """Tilaston summa kaikilta pelaajilta, esim. total("used:Shield")."""
+        with self.lock:
+            changes = self.unwritten_changes()
+            (value,) = self.connection.execute(
+                "SELECT COALESCE(SUM(value), 0) FROM player_stats WHERE stat = ?",
+                (stat,)).fetchone()
+        return value + sum(v for (_, s), v in changes.items() if s == stat)
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        self.connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show player statistics.")
+    parser.add_argument("path", help="statistics database (see --stats in MainPython.py)")
+    parser.add_argument("--stat", default="drinks",
+                        help=f"statistic to rank by: {', '.join(STATS)} or e.g. used:Shield")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    store = StatsStore(args.path)
+    try:
+        for rank, (player, value) in enumerate(store.leaderboard(args.stat, args.limit), 1):
+            print(f"{rank:>3}. {player:<24} {value}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
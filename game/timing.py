@@ -0,0 +1,31 @@
+import time
+
+
+class StartupTimer:
+    """Kirjaa käynnistyksen vaiheiden ajat ohjelman alusta lähtien."""
+
+    def __init__(self, start=None, budget=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.budget = budget
+        self.marks = []
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def elapsed(self, label):
+        for name, seconds in self.marks:
+            if name == label:
+                return seconds
+        return None
+
+    def report(self, budget_mark="first paint"):
+        lines = ["Startup times:"]
+        previous = 0.0
+        for label, seconds in self.marks:
+            lines.append(f"  {label:<20} {seconds * 1000:8.1f} ms  (+{(seconds - previous) * 1000:.1f})")
+            previous = seconds
+        total = self.elapsed(budget_mark)
+        if self.budget is not None and total is not None:
+            status = "OK" if total <= self.budget else "OVER BUDGET"
+            lines.append(f"  {budget_mark} {total * 1000:.1f} ms / budget {self.budget * 1000:.0f} ms: {status}")
+        return "\n".join(lines)
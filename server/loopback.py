@@ -0,0 +1,100 @@
+"""Paikallinen testiajo: käynnistää palvelimen ja joukon bottiasiakkaita.
+
+    python -m server.loopback --tables 20 --players 10 --turns 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from server.tables import TableServer, encode
+
+
+class BotClient:
+    """Pelaa pöydässä: aina kun on oma vuoro, klikkaa satunnaista korttia."""
+
+    def __init__(self, table, player):
+        self.table = table
+        self.player = player
+        self.state = {}
+        self.turns_seen = 0
+        self.errors = []
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port, limit=1024 * 1024)
+        self.send({"op": "join", "table": self.table, "player": self.player})
+        await self.writer.drain()
+
+    def send(self, request):
+        self.writer.write(encode(request))
+
+    def apply(self, message):
+        if message["type"] == "welcome":
+            self.state = message["state"]
+        elif message["type"] == "update":
+            inventory = message["state"].pop("inventory", None)
+            self.state.update(message["state"])
+            if inventory:
+                self.state.setdefault("inventory", {}).update(inventory)
+            self.turns_seen += sum(1 for event, _ in message["events"] if event == "turn_started")
+        elif message["type"] == "error":
+            self.errors.append(message["error"])
+
+    def act(self):
+        state = self.state
+        if state.get("turn") != self.player or not state.get("faces"):
+            return
+        index = state.get("locked")
+        if index is None:
+            index = random.randrange(len(state["faces"]))
+        self.send({"op": "select", "index": index})
+
+    async def run(self, until_turns):
+        while self.turns_seen < until_turns:
+            line = await self.reader.readline()
+            if not line:
+                break
+            self.apply(json.loads(line))
+            self.act()
+        self.writer.close()
+
+
+async def run_loopback(tables, players, turns, host="127.0.0.1"):
+    server = await TableServer().start(host, 0)
+    port = server.sockets[0].getsockname()[1]
+    clients = [BotClient(f"table-{t}", f"bot-{t}-{p}")
+               for t in range(tables) for p in range(players)]
+    for client in clients:
+        await client.connect(host, port)
+    # Kaikki ovat liittyneet, kun jokainen on saanut welcome-viestin
+    for client in clients:
+        while not client.state:
+            client.apply(json.loads(await client.reader.readline()))
+    for t in range(tables):
+        clients[t * players].send({"op": "start"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client.run(turns) for client in clients))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+
+    played = min(client.turns_seen for client in clients) * tables
+    errors = sum(len(client.errors) for client in clients)
+    print(f"{tables} tables x {players} players: {played} turns in {elapsed:.2f} s "
+          f"({played / elapsed:,.0f} turns/s), {errors} errors")
+    return clients
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run bot clients against a local table server.")
+    parser.add_argument("--tables", type=int, default=10)
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=100, help="turns per table")
+    args = parser.parse_args(argv)
+    asyncio.run(run_loopback(args.tables, args.players, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Monen pöydän peli-palvelin (asyncio, TCP, yksi JSON-viesti per rivi).
+
+Asiakas lähettää:
+    {"op": "join", "table": "pöytä", "player": "nimi"}
+    {"op": "start"}
+    {"op": "select", "index": 0}
+    {"op": "roll"} / {"op": "redraw"} / {"op": "use", "item": "Shield"}
+
+Palvelin vastaa liittymiseen viestillä {"type": "welcome", "state": {...}}
+ja lähettää sen jälkeen pöydän kaikille pelaajille erissä
+{"type": "update", "events": [[tapahtuma, argumentit], ...], "state": {...}},
+jossa "state" sisältää vain muuttuneet kentät. Kaikki saman
+tapahtumasilmukan kierroksen aikana syntyneet tapahtumat kootaan yhteen
+viestiin, ja viesti koodataan kerran koko pöydälle.
+
+Jaettuja kortteja (cards_dealt) ei lähetetä, koska niissä on myös
+piilotettu kortti; käsi luetaan tilan "faces"-kentästä. Jos vuorossa
+oleva pelaaja katkaisee yhteyden, vuoro siirtyy seuraavalle
+yhdistetylle pelaajalle.
+"""
+import argparse
+import asyncio
+import json
+
+from game import engine as rules
+from game import events
+from game.engine import GameEngine
+
+# Kun asiakkaan lähetyspuskuri kasvaa tätä suuremmaksi, yhteys katkaistaan
+MAX_BUFFERED = 256 * 1024
+
+# Pisin hyväksytty pyyntörivi
+MAX_LINE = 64 * 1024
+
+# Tapahtumat, jotka paljastaisivat piilotetun kortin; tila kertoo näkyvän käden
+PRIVATE_EVENTS = frozenset((events.CARDS_DEALT,))
+
+
+class Table:
+    def __init__(self, name, loop):
+        self.name = name
+        self.loop = loop
+        self.engine = GameEngine()
+        self.engine.listeners.append(self.on_event)
+        self.connections = {}  # pelaaja -> StreamWriter
+        self.started = False
+        self.pending = []
+        self.dirty_players = set()
+        self.flush_scheduled = False
+        self.sent_state = {}
+
+    def public_state(self, players=None):
+        engine = self.engine
+        if players is None:
+            players = engine.players
+        state = {
+            "players": list(engine.players),
+            "started": self.started,
+            "turn": engine.current_player if self.started else None,
+            "faces": [engine.card_face(i) for i in range(len(engine.current_cards))],
+            "locked": engine.locked_index,
+            "redraw_used": engine.redraw_used,
+        }
+        state["inventory"] = {p: engine.inventory.snapshot(p) for p in players}
+        return state
+
+    def on_event(self, event, args):
+        if event not in PRIVATE_EVENTS:
+            self.pending.append([event, list(args)])
+        if event in (events.ITEM_ADDED, events.ITEM_USED, events.PLAYER_ADDED):
+            self.dirty_players.add(args[0])
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.loop.call_soon(self.flush)
+
+    def diff_state(self):
+        state = self.public_state(self.dirty_players)
+        self.dirty_players = set()
+        changed = {}
+        for key, value in state.items():
+            if key == "inventory":
+                if value:
+                    changed[key] = value
+            elif self.sent_state.get(key) != value:
+                changed[key] = value
+                self.sent_state[key] = value
+        return changed
+
+    def flush(self):
+        self.flush_scheduled = False
+        state = self.diff_state()
+        if not self.pending and not state:
+            return
+        message = {"type": "update", "events": self.pending, "state": state}
+        self.pending = []
+        self.broadcast(encode(message))
+
+    def broadcast(self, data):
+        dropped = []
+        for player, writer in self.connections.items():
+            if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                # Hidas asiakas ei saa kasvattaa palvelimen muistia rajatta
+                writer.close()
+                dropped.append((player, writer))
+                continue
+            writer.write(data)
+        # leave() siirtää vuoron, jos pudotettu pelaaja oli vuorossa
+        for player, writer in dropped:
+            self.leave(player, writer)
+
+    def join(self, player, writer):
+        old = self.connections.get(player)
+        if old is not None and old is not writer:
+            old.close()
+        self.engine.add_player(player)
+        self.flush()
+        self.connections[player] = writer
+        state = self.public_state()
+        self.sent_state.update({k: v for k, v in state.items() if k != "inventory"})
+        writer.write(encode({"type": "welcome", "table": self.name, "player": player,
+                             "state": state}))
+
+    def leave(self, player, writer):
+        if self.connections.get(player) is not writer:
+            return
+        del self.connections[player]
+        if self.started and player == self.engine.current_player:
+            self.advance_turn()
+
+    def advance_turn(self):
+        """Siirtää vuoron seuraavalle pelaajalle, jolla on yhteys pöytään."""
+        engine = self.engine
+        for _ in engine.players:
+            if engine.next_player() in self.connections:
+                engine.start_turn()
+                return
+        # Kukaan ei ole paikalla; peli jatkuu, kun joku liittyy ja antaa startin
+        self.started = False
+        self.flush()
+
+    def handle(self, player, request):
+        op = request.get("op")
+        engine = self.engine
+        if op == "start":
+            if not self.started and engine.players:
+                self.started = True
+                if engine.current_player in self.connections:
+                    engine.start_turn()
+                else:
+                    self.advance_turn()
+            return None
+        if not self.started:
+            return "game has not started"
+        if player != engine.current_player:
+            return "not your turn"
+        if op == "select":
+            index = request.get("index")
+            if (not isinstance(index, int) or isinstance(index, bool)
+                    or not 0 <= index < len(engine.current_cards)):
+                return "invalid card index"
+            outcome = engine.select_card(index)
+            if outcome in rules.TURN_ENDING:
+                self.advance_turn()
+        elif op == "roll":
+            engine.roll_penalty()
+        elif op == "redraw":
+            engine.redraw_penalty()
+        elif op == "use":
+            item = request.get("item")
+            if not isinstance(item, str):
+                return "invalid item"
+            engine.use_item(item)
+        else:
+            return f"unknown op {op!r}"
+        return None
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class TableServer:
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name):
+        table = self.tables.get(name)
+        if table is None:
+            table = Table(name, asyncio.get_running_loop())
+            self.tables[name] = table
+        return table
+
+    async def handle_client(self, reader, writer):
+        table = None
+        player = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Rivi ylitti MAX_LINE-rajan; loppuosaa ei voi enää tulkita
+                    writer.write(encode({"type": "error", "error": "request too long"}))
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    writer.write(encode({"type": "error", "error": "invalid JSON"}))
+                    continue
+                if not isinstance(request, dict):
+                    writer.write(encode({"type": "error", "error": "request must be an object"}))
+                    continue
+                if request.get("op") == "join":
+                    if table is not None:
+                        table.leave(player, writer)
+                    player = str(request.get("player", "")).strip()
+                    if not player:
+                        writer.write(encode({"type": "error", "error": "player name missing"}))
+                        continue
+                    table = self.table(str(request.get("table", "default")))
+                    table.join(player, writer)
+                    continue
+                if table is None:
+                    writer.write(encode({"type": "error", "error": "join a table first"}))
+                    continue
+                error = table.handle(player, request)
+                if error is not None:
+                    writer.write(encode({"type": "error", "error": error}))
+                if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if table is not None:
+                table.leave(player, writer)
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+
+
+async def serve(host, port):
+    server = await TableServer().start(host, port)
+    addresses = ", ".join(str(s.getsockname()) for s in server.sockets)
+    print(f"Serving tables on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host drinking game tables over TCP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
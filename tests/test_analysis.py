@@ -0,0 +1,49 @@
+import itertools
+
+import pytest
+
+from game.analysis import OutcomeAnalysis, card_drinks, inclusion_probabilities
+from game.engine import GameEngine
+
+
+def brute_force(weights, hand_size):
+    """Käy läpi kaikki nostojärjestykset: seuraava kortti painojen suhteessa jäljellä olevista."""
+    inclusion = [0.0] * len(weights)
+    for order in itertools.permutations(range(len(weights)), hand_size):
+        p = 1.0
+        rest = sum(weights)
+        for i in order:
+            p *= weights[i] / rest
+            rest -= weights[i]
+        for i in order:
+            inclusion[i] += p
+    return inclusion
+
+
+@pytest.mark.parametrize("weights", [
+    [1.0, 1.0, 1.0, 1.0],
+    [1.0, 2.0, 0.5, 0.2, 1.0],
+    [3.0, 1.0, 1.0, 0.05, 0.5, 2.0],
+])
+@pytest.mark.parametrize("hand_size", [1, 2, 3, 4])
+def test_inclusion_matches_brute_force(weights, hand_size):
+    exact = inclusion_probabilities(weights, hand_size)
+    assert exact == pytest.approx(brute_force(weights, hand_size))
+    assert sum(exact) == pytest.approx(hand_size)
+
+
+def test_card_drinks():
+    assert card_drinks("Drink 2") == (2, 0)
+    assert card_drinks("Penalty Drink 3") == (3, 0)
+    assert card_drinks("Give 4") == (0, 4)
+    assert card_drinks("Crowd Challenge") == (0, 0)
+
+
+def test_outcomes_add_up():
+    analysis = OutcomeAnalysis(GameEngine(seed=0), redraw_chance=0.1)
+    assert sum(analysis.outcomes.values()) == pytest.approx(1.0)
+    assert sum(analysis.faces.values()) == pytest.approx(analysis.outcomes["selected"])
+    assert sum(analysis.items.values()) == pytest.approx(analysis.outcomes["item"])
+    assert sum(analysis.penalties.values()) == pytest.approx(1.0)
+    # Surprise Card näkyy muunnettuna
+    assert "Surprise Card" not in analysis.faces and "Drink 5" in analysis.faces
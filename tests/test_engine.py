@@ -0,0 +1,124 @@
+from game import engine as rules
+from game import events
+from game.engine import GameEngine
+from game.simulate import RandomBot, run_bot_game
+
+
+def new_game(seed=1, players=("a", "b"), **settings):
+    game = GameEngine(seed=seed)
+    for name, value in settings.items():
+        setattr(game, name, value)
+    for player in players:
+        game.add_player(player)
+    return game
+
+
+def test_hidden_card_is_revealed_and_locks_the_hand():
+    game = new_game(ITEM_CHANCE=0.0, DITTO_CHANCE=0.0)
+    game.start_turn()
+    hidden = game.hidden_index
+    assert game.card_face(hidden) == "???"
+    other = (hidden + 1) % game.HAND_SIZE
+
+    assert game.select_card(hidden) == rules.REVEALED
+    assert game.card_face(hidden) == game.current_cards[hidden]
+    assert game.locked_index == hidden
+    assert game.select_card(other) is None
+    assert game.select_card(hidden) == rules.SELECTED
+
+
+def test_visible_card_is_selected_at_once():
+    game = new_game(ITEM_CHANCE=0.0, DITTO_CHANCE=0.0)
+    game.start_turn()
+    visible = (game.hidden_index + 1) % game.HAND_SIZE
+    assert game.select_card(visible) == rules.SELECTED
+    assert game.select_card(game.HAND_SIZE) is None
+
+
+def test_ditto_needs_a_second_click():
+    game = new_game(ITEM_CHANCE=0.0, DITTO_CHANCE=1.0)
+    game.start_turn()
+    visible = (game.hidden_index + 1) % game.HAND_SIZE
+    assert game.select_card(visible) == rules.DITTO
+    assert game.card_face(visible) == "Ditto"
+    assert game.select_card(game.hidden_index) is None
+    assert game.select_card(visible) == rules.DITTO_CONFIRMED
+
+
+def test_item_goes_to_the_current_players_inventory():
+    game = GameEngine(item_cards=("Shield",), seed=1)
+    game.ITEM_CHANCE = 1.0
+    game.add_player("a")
+    game.start_turn()
+    assert game.current_cards == ["Shield"] * game.HAND_SIZE
+    visible = (game.hidden_index + 1) % game.HAND_SIZE
+    assert game.select_card(visible) == rules.ITEM
+    assert game.inventory.snapshot("a") == {"Shield": 1}
+
+    assert game.use_item("Shield")
+    assert not game.use_item("Shield")
+    assert game.inventory.snapshot("a") == {}
+
+
+def test_redraw_is_allowed_once_per_turn():
+    game = new_game()
+    seen = []
+    game.listeners.append(lambda event, args: seen.append(event))
+    game.start_turn()
+    ok, card = game.redraw_penalty()
+    assert ok and card in game.penalty_deck.cards
+    assert game.redraw_penalty() == (False, None)
+    assert events.REDRAW_REFUSED in seen
+    game.next_player()
+    game.start_turn()
+    assert game.redraw_penalty()[0]
+
+
+def test_turns_rotate_through_players():
+    game = new_game(players=("a", "b", "c"))
+    assert [game.next_player() for _ in range(4)] == ["b", "c", "a", "b"]
+    assert not game.add_player("a")
+
+
+def play(seed, prefetch=False, shoe=False):
+    game = new_game(seed=seed, players=("a", "b", "c"))
+    if shoe:
+        game.use_shoe(2, normal=True)
+    log = []
+    game.listeners.append(lambda event, args: log.append((event, args)))
+    bot = RandomBot()
+    game.start_turn()
+    for _ in range(500):
+        if prefetch:
+            game.prefetch()
+        outcome = bot.play_turn(game)
+        assert outcome in rules.TURN_ENDING
+        game.next_player()
+        game.start_turn()
+    return log, game.snapshot()
+
+
+def test_same_seed_plays_the_same_game():
+    assert play(5) == play(5)
+    assert play(5) != play(6)
+
+
+def test_prefetch_does_not_change_a_seeded_game():
+    assert play(5, prefetch=True) == play(5)
+    assert play(5, prefetch=True, shoe=True) == play(5, shoe=True)
+
+
+def test_prefetched_hands_are_dropped_after_a_deck_change():
+    game = new_game(ITEM_CHANCE=0.0)
+    game.prefetch()
+    game.normal_deck.remove("Give 3")
+    for _ in range(50):
+        game.start_turn()
+        assert "Give 3" not in game.current_cards
+
+
+def test_bot_game_counts_every_turn():
+    game = new_game(seed=3, players=("a", "b", "c", "d"))
+    counts = run_bot_game(game, RandomBot(), 2000)
+    assert sum(counts.values()) == 2000
+    assert set(counts) == set(rules.TURN_ENDING)
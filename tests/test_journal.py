@@ -0,0 +1,113 @@
+import os
+import time
+
+from game import events
+from game.engine import GameEngine
+from game.journal import GameJournal, decode_events, encode_event, load_journal, resume
+from game.simulate import RandomBot
+
+
+def test_events_survive_encoding():
+    recorded = [
+        (events.PLAYER_ADDED, ("Äijä",)),
+        (events.CARDS_DEALT, ("Äijä", ("Drink 1", "Give 3", "Shield"), 2)),
+        (events.CARD_REVEALED, ("Äijä", 2, "Shield")),
+        (events.ITEM_ADDED, ("Äijä", "Shield")),
+    ]
+    data = b"".join(encode_event(event, args) for event, args in recorded)
+    assert decode_events(data) == (recorded, len(data))
+    # Kesken jäänyt viimeinen tietue ohitetaan, ja loppukohta on sitä edeltävän lopussa
+    last = len(encode_event(*recorded[-1]))
+    assert decode_events(data[:-3]) == (recorded[:-1], len(data) - last)
+
+
+def play(game, turns):
+    bot = RandomBot()
+    for _ in range(turns):
+        bot.play_turn(game)
+        game.next_player()
+        game.start_turn()
+
+
+def play_journaled(path, turns, snapshot_every):
+    game = GameEngine(seed=11)
+    journal = GameJournal(str(path), game, snapshot_every=snapshot_every)
+    game.listeners.append(journal.record)
+    for player in ("a", "b", "c"):
+        game.add_player(player)
+    game.start_turn()
+    play(game, turns)
+    game.select_card(game.hidden_index)  # vuoro jää kesken
+    journal.close()
+    return game
+
+
+def crash(journal):
+    """Pysäyttää kirjoittajan kuten kaatuminen: tapahtumat levyllä, ei lopputilannekuvaa."""
+    journal.queue.put(None)
+    journal.thread.join()
+
+
+def test_resume_restores_the_game(tmp_path):
+    path = tmp_path / "game.journal"
+    game = play_journaled(path, 300, snapshot_every=97)
+    state, history, tail, end = load_journal(str(path))
+    assert state is not None and tail == []
+    assert end == os.path.getsize(path)
+
+    restored = GameEngine(seed=0)
+    lines = resume(restored, str(path))
+    assert restored.snapshot() == game.snapshot()
+    assert lines == history
+
+
+def test_resume_replays_events_after_the_snapshot(tmp_path):
+    path = tmp_path / "game.journal"
+    game = play_journaled(path, 120, snapshot_every=10_000)
+    # Ilman välitilannekuvaa peli toistetaan tapahtumista
+    (path.parent / "game.journal.snap").unlink()
+
+    restored = GameEngine(seed=0)
+    resume(restored, str(path))
+    assert restored.snapshot() == game.snapshot()
+
+
+def test_resume_after_a_torn_write_can_append(tmp_path):
+    path = str(tmp_path / "game.journal")
+    game = GameEngine(seed=2)
+    journal = GameJournal(path, game, snapshot_every=50)
+    game.listeners.append(journal.record)
+    for player in ("a", "b", "c"):
+        game.add_player(player)
+    game.start_turn()
+    play(game, 130)
+    crash(journal)
+    # Viimeinen tietue jää kesken
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    resumed = GameEngine(seed=9)
+    history = resume(resumed, path)
+    journal = GameJournal(path, resumed, history=history, append=True)
+    resumed.listeners.append(journal.record)
+    resumed.start_turn()
+    play(resumed, 40)
+    crash(journal)
+
+    again = GameEngine(seed=0)
+    resume(again, path)
+    assert again.snapshot() == resumed.snapshot()
+
+
+def test_events_reach_the_file_without_a_snapshot(tmp_path):
+    path = str(tmp_path / "game.journal")
+    game = GameEngine(seed=1)
+    journal = GameJournal(path, game, snapshot_every=10_000)
+    game.listeners.append(journal.record)
+    game.add_player("a")
+    # Jono tyhjenee, joten kirjoittaja vie tapahtuman tiedostoon ilman close()-kutsua
+    deadline = time.monotonic() + 2
+    while os.path.getsize(path) <= 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert load_journal(path)[2] == [(events.PLAYER_ADDED, ("a",))]
+    journal.close()
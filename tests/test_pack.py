@@ -0,0 +1,100 @@
+import pickle
+
+import pytest
+
+from cards.pack import load_pack, parse_pack
+from cards.weighted import RARITIES
+
+
+def write_pack(tmp_path, text, name="test.pack"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_sections_weights_and_transforms(tmp_path):
+    path = write_pack(tmp_path, """
+        # kommentti
+        [normal]
+        Drink 1
+        Drink 2 @ 2          # paino
+        Surprise Card @ rare => Drink 5
+        [penalty]
+        Penalty Drink 1 @ uncommon
+        [items]
+        Shield
+    """)
+    cards, transforms = parse_pack(path)
+    assert cards["normal"] == {"Drink 1": 1.0, "Drink 2": 2.0, "Surprise Card": RARITIES["rare"]}
+    assert cards["penalty"] == {"Penalty Drink 1": RARITIES["uncommon"]}
+    assert list(cards["items"]) == ["Shield"]
+    assert transforms == {"Surprise Card": "Drink 5"}
+
+
+def test_weight_after_the_transform_target(tmp_path):
+    path = write_pack(tmp_path, "[normal]\nSurprise Card => Drink 5 @ 2\n")
+    cards, transforms = parse_pack(path)
+    assert cards["normal"] == {"Surprise Card": 2.0}
+    assert transforms == {"Surprise Card": "Drink 5"}
+
+
+@pytest.mark.parametrize("text, message", [
+    ("[normal]\nA @ 2 => B @ 3\n", "both sides"),
+    ("[normal]\nA @ heavy\n", "unknown weight"),
+    ("[normal]\nA @ 0\n", "positive"),
+    ("[bonus]\nA\n", "unknown section"),
+    ("A\n", "outside of a section"),
+    ("[penalty]\nA => B\n", "only normal cards"),
+])
+def test_errors_name_the_line(tmp_path, text, message):
+    path = write_pack(tmp_path, text)
+    with pytest.raises(ValueError, match=message):
+        parse_pack(path)
+
+
+def test_compiled_pack_is_cached(tmp_path):
+    path = write_pack(tmp_path, "[normal]\nDrink 1\nGive 2 @ 3 => Drink 2\n[penalty]\nPenalty Drink 1\n")
+    pack = load_pack(path)
+    assert (tmp_path / "test.packcache").exists()
+    cached = load_pack(path)
+    assert cached.normal == pack.normal
+    assert cached.transforms == {"Give 2": "Drink 2"}
+
+    deck = cached.normal_deck()
+    assert deck.cards == ["Drink 1", "Give 2"]
+    assert deck.transforms == {"Give 2": "Drink 2"}
+    assert cached.penalty_deck().cards == ["Penalty Drink 1"]
+
+
+def test_default_pack_loads():
+    pack = load_pack("cards/default.pack", use_cache=False)
+    assert len(pack.normal_deck()) >= 3
+    assert len(pack.penalty_deck()) >= 1
+
+
+class Marker:
+    """Pickle, joka ladattaessa loisi tiedoston."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return open, (self.path, "w")
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage", "pickle"])
+def test_broken_cache_is_rebuilt(tmp_path, damage):
+    path = write_pack(tmp_path, "[normal]\nDrink 1\nGive 2 => Drink 2\n[penalty]\nPenalty Drink 1\n")
+    pack = load_pack(path)
+    cache = tmp_path / "test.packcache"
+    if damage == "truncate":
+        cache.write_bytes(cache.read_bytes()[:-3])
+    elif damage == "garbage":
+        cache.write_bytes(b"\x00" * 40)
+    else:
+        cache.write_bytes(pickle.dumps(Marker(str(tmp_path / "ran"))))
+
+    rebuilt = load_pack(path)
+    assert not (tmp_path / "ran").exists()
+    assert rebuilt.normal == pack.normal and rebuilt.transforms == pack.transforms
+    assert load_pack(path).normal == pack.normal  # uusi välimuisti on taas kelvollinen
@@ -0,0 +1,64 @@
+import collections
+
+import pytest
+
+from cards.penalty_deck import PenaltyDeck
+from cards.shoe import Shoe
+from cards.weighted import WeightedDeck
+from game.rng import GameRandom
+
+
+def make_deck(cards, weights=None):
+    deck = WeightedDeck()
+    for card, weight in zip(cards, weights or [1.0] * len(cards)):
+        deck.add(card, weight)
+    deck.rng = GameRandom(1)
+    return deck
+
+
+def test_cards_do_not_repeat_before_the_reshuffle():
+    deck = make_deck("abcdefgh")
+    shoe = Shoe(deck, decks=2, reshuffle_at=0.25)
+    drawn = [shoe.next_index() for _ in range(12)]
+    assert len(shoe) == 16
+    assert max(collections.Counter(drawn).values()) <= 2
+    assert shoe.remaining() == 0
+    assert [deck.cards[i] for i in drawn] == shoe.discards()
+
+    shoe.next_index()
+    assert shoe.shuffles == 2
+    assert shoe.remaining() == 11
+
+
+def test_copies_follow_the_weights():
+    deck = make_deck("abc", [1.0, 2.0, 0.5])
+    shoe = Shoe(deck)
+    shoe.sync()
+    counts = collections.Counter(deck.cards[i] for i in shoe.order)
+    assert counts == {"a": 2, "b": 4, "c": 1}
+
+
+def test_shoe_is_rebuilt_after_a_deck_change():
+    deck = make_deck("abcd")
+    shoe = Shoe(deck, reshuffle_at=0.0)
+    shoe.next_index()
+    deck.remove("b")
+    drawn = {deck.cards[shoe.next_index()] for _ in range(3)}
+    assert drawn == {"a", "c", "d"}
+
+
+@pytest.mark.parametrize("decks, reshuffle_at", [(0, 0.25), (1, 1.0), (1, -0.1)])
+def test_invalid_settings(decks, reshuffle_at):
+    with pytest.raises(ValueError):
+        Shoe(make_deck("ab"), decks, reshuffle_at)
+
+
+def test_penalty_deck_draws_from_its_shoe():
+    deck = PenaltyDeck()
+    deck.rng = GameRandom(2)
+    deck.use_shoe(1, reshuffle_at=0.0)
+    cards = [deck.draw_penalty_card() for _ in range(len(deck.shoe))]
+    assert deck.cards_remaining() == 0
+    assert sorted(cards) == sorted(deck.cards[i] for i in deck.shoe.order)
+    deck.use_shoe(0)
+    assert deck.cards_remaining() is None
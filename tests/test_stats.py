@@ -0,0 +1,62 @@
+import sqlite3
+import threading
+
+from game.engine import GameEngine
+from game.simulate import RandomBot, run_bot_game
+from game.stats import SCHEMA, StatsStore
+
+
+def test_queries_include_unwritten_changes(tmp_path):
+    stats = StatsStore(str(tmp_path / "stats.sqlite"), flush_every=7, flush_interval=60)
+    try:
+        game = GameEngine(seed=4)
+        game.listeners.append(stats.record)
+        for player in ("a", "b", "c"):
+            game.add_player(player)
+        run_bot_game(game, RandomBot(), 500)
+        before = (stats.leaderboard("drinks", 2), stats.player("b"), stats.total("turns"))
+        stats.sync()
+        assert (stats.leaderboard("drinks", 2), stats.player("b"), stats.total("turns")) == before
+        assert stats.total("turns") == 501
+    finally:
+        stats.close()
+
+
+def test_totals_accumulate_across_sessions(tmp_path):
+    path = str(tmp_path / "stats.sqlite")
+    for _ in range(2):
+        stats = StatsStore(path)
+        stats.record("turn_started", ("a",))
+        stats.close()
+    stats = StatsStore(path)
+    try:
+        assert stats.player("a") == {"turns": 2}
+        assert stats.leaderboard("turns") == [("a", 2)]
+    finally:
+        stats.close()
+
+
+def test_failed_write_is_kept_and_retried(tmp_path, capsys):
+    path = str(tmp_path / "stats.sqlite")
+    stats = StatsStore(path, flush_interval=60)
+    other = sqlite3.connect(path)
+    try:
+        other.execute("DROP TABLE player_stats")
+        other.commit()
+        stats.record("turn_started", ("a",))
+        # Epäonnistunut kirjoitus ei saa jumittaa sync()-kutsua
+        syncing = threading.Thread(target=stats.sync, daemon=True)
+        syncing.start()
+        syncing.join(5)
+        assert not syncing.is_alive()
+        assert "Could not save statistics" in capsys.readouterr().err
+
+        other.executescript(SCHEMA)
+        assert stats.player("a") == {"turns": 1}
+        stats.sync()
+        assert other.execute("SELECT player, stat, value FROM player_stats").fetchall() == [
+            ("a", "turns", 1)]
+        assert stats.player("a") == {"turns": 1}
+    finally:
+        other.close()
+        stats.close()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from server.tables import MAX_BUFFERED, Table, TableServer
+
+
+async def exchange(requests_by_player, wait=0.1):
+    """Ajaa palvelimen ja pelaajat silmukassa; palauttaa kunkin pelaajan saamat viestit."""
+    server = await TableServer().start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    received = {}
+    try:
+        for player, requests in requests_by_player:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for request in requests:
+                line = request if isinstance(request, str) else json.dumps(request)
+                writer.write(line.encode("utf-8") + b"\n")
+                await asyncio.sleep(wait)
+            if not reader.at_eof():
+                try:
+                    writer.write_eof()
+                except OSError:
+                    pass  # palvelin katkaisi yhteyden
+            messages = received.setdefault(player, [])
+            while line := await reader.readline():
+                messages.append(json.loads(line))
+            writer.close()
+    finally:
+        server.close()
+    return received
+
+
+def test_dealt_cards_are_not_broadcast():
+    received = asyncio.run(exchange([
+        ("a", [{"op": "join", "table": "t", "player": "a"}, {"op": "start"}]),
+    ]))
+    updates = [m for m in received["a"] if m["type"] == "update"]
+    assert updates
+    assert all(event != "cards_dealt" for m in updates for event, _ in m["events"])
+    faces = [m["state"]["faces"] for m in updates if "faces" in m["state"]][-1]
+    assert faces.count("???") == 1
+
+
+def test_bad_requests_get_errors():
+    received = asyncio.run(exchange([
+        ("a", ["[1, 2]", "{", {"op": "start"}, "x" * 70_000]),
+    ]))
+    errors = [m["error"] for m in received["a"] if m["type"] == "error"]
+    assert errors == ["request must be an object", "invalid JSON", "join a table first",
+                      "request too long"]
+
+
+def test_bad_arguments_get_errors():
+    received = asyncio.run(exchange([
+        ("a", [{"op": "join", "table": "t", "player": "a"}, {"op": "start"},
+               {"op": "use", "item": ["x"]}, {"op": "select", "index": True},
+               {"op": "select", "index": 3}, {"op": "roll"}]),
+    ]))
+    errors = [m["error"] for m in received["a"] if m["type"] == "error"]
+    assert errors == ["invalid item", "invalid card index", "invalid card index"]
+    # Yhteys pysyi auki virheiden jälkeen
+    assert any(event == "penalty_rolled" for m in received["a"] if m["type"] == "update"
+               for event, _ in m["events"])
+
+
+class Writer:
+    """StreamWriterin korvike, jonka lähetyspuskurin koon testi asettaa."""
+
+    def __init__(self):
+        self.buffered = 0
+        self.closed = False
+        self.transport = self
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_dropping_a_slow_player_passes_the_turn():
+    loop = asyncio.new_event_loop()
+    try:
+        table = Table("t", loop)
+        slow = Writer()
+        table.join("a", slow)
+        table.join("b", Writer())
+        table.handle("b", {"op": "start"})
+        assert table.engine.current_player == "a"
+        slow.buffered = MAX_BUFFERED + 1
+        table.flush()
+        assert slow.closed and "a" not in table.connections
+        assert table.engine.current_player == "b"
+    finally:
+        loop.close()
@@ -0,0 +1,61 @@
+import os
+import time
+
+import pytest
+
+# Ikkunatestit tarvitsevat näytön; ilman sitä ne ohitetaan (xvfb-run python -m pytest)
+pytestmark = pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="needs a display")
+
+tk = pytest.importorskip("tkinter")
+
+from MainPython import GameApp  # noqa: E402
+from views.resources import ResourceRegistry  # noqa: E402
+
+
+def pump(root, seconds=0.5):
+    """Ajaa Tk:n tapahtumasilmukkaa, jotta ajastimet ja idle-työt ehtivät laueta."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        root.update()
+        time.sleep(0.01)
+
+
+def start_game(app):
+    app.add_player("a")
+    app.add_player("b")
+    app.show_frame("GameFrame")
+    frame = app.get_frame("GameFrame")
+    frame.update_for_new_turn()
+    return frame
+
+
+def test_closing_windows_one_by_one(tmp_path):
+    resources = ResourceRegistry()
+    first = GameApp(resources=resources, seed=1, stats_path=str(tmp_path / "stats.db"))
+    second = GameApp(resources=resources, seed=2, journal_path=str(tmp_path / "game.hbj"))
+    root = resources.root
+    errors = []
+    root.report_callback_exception = lambda *exc: errors.append(exc)
+    assert second.master is root and resources.windows == 2
+
+    frame = start_game(first)
+    start_game(second)
+    first.perf_overlay.toggle()
+    pump(root, 0.2)
+    # Kääntöanimaatio ja overlayn päivitys ovat kesken, kun ikkuna suljetaan
+    frame.select_card(frame.engine.hidden_index)
+    first.exit_game()
+    pump(root)
+    assert errors == []
+    assert resources.windows == 1 and resources.root is root
+
+    # Toinen ikkuna toimii yhä yhteisillä fonteilla ja teemalla
+    second.perf_overlay.toggle()
+    second.next_player()
+    pump(root)
+    assert errors == []
+
+    second.exit_game()
+    assert resources.windows == 0 and resources.root is None
+    with pytest.raises(tk.TclError):
+        root.winfo_exists()
@@ -0,0 +1,77 @@
+import time
+
+
+class AnimationClock:
+    """Yksi yhteinen kello kaikille animaatioille.
+
+    Animaatio on lista (aika_ms, funktio) -avainkehyksiä. Kello tikittää
+    tasaisella taajuudella vain kun animaatioita on käynnissä, ja ajaa
+    kaikkien animaatioiden erääntyneet kehykset samalla tikillä, joten
+    CardWidgetin idle-piirto yhdistää ne yhdeksi piirroksi.
+
+    Jokainen animaatio kuuluu nykyiseen ryhmään (vuoroon). new_group()
+    peruu edellisen vuoron animaatiot, jotta esim. välähdys ei palauta
+    vanhaa reunaväriä uuden vuoron kortille.
+    """
+
+    def __init__(self, widget, fps=30):
+        self.widget = widget
+        self.interval = max(1, int(1000 / fps))
+        self.animations = {}  # avain -> [alkuaika, kehykset, seuraava indeksi, ryhmä]
+        self.group = 0
+        self.job = None
+        self.ticking = False
+
+    def play(self, key, keyframes, finish_previous=False):
+        """Käynnistää animaation; saman avaimen vanha animaatio korvataan."""
+        if finish_previous:
+            self.finish(key)
+        self.animations[key] = [time.perf_counter(), sorted(keyframes, key=lambda f: f[0]),
+                                0, self.group]
+        if not self.ticking:
+            self.tick()
+
+    def cancel(self, key):
+        self.animations.pop(key, None)
+
+    def finish(self, key):
+        """Ajaa animaation jäljellä olevat kehykset heti."""
+        animation = self.animations.pop(key, None)
+        if animation is not None:
+            for _, callback in animation[1][animation[2]:]:
+                callback()
+
+    def stop(self):
+        """Peruu kaikki animaatiot ja kellon ajastimen (ikkunaa suljettaessa)."""
+        self.animations = {}
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+
+    def new_group(self):
+        self.animations = {key: a for key, a in self.animations.items() if a[3] != self.group}
+        self.group += 1
+
+    def tick(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        now = time.perf_counter()
+        self.ticking = True
+        for key, animation in list(self.animations.items()):
+            if self.animations.get(key) is not animation:
+                continue  # peruttu tällä tikillä
+            start, frames, index, _ = animation
+            elapsed = (now - start) * 1000
+            while index < len(frames) and frames[index][0] <= elapsed:
+                frames[index][1]()
+                index += 1
+            if index >= len(frames):
+                # Kehys on voinut jo korvata animaation uudella samalla avaimella
+                if self.animations.get(key) is animation:
+                    del self.animations[key]
+            else:
+                animation[2] = index
+        self.ticking = False
+        if self.animations:
+            self.job = self.widget.after(self.interval, self.tick)
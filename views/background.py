@@ -0,0 +1,114 @@
+import collections
+import queue
+import threading
+
+from PIL import Image, ImageTk
+
+
+def decode_background(path):
+    """Avaa ja purkaa kuvan sekä tekee esikatselukuvan; ajettavissa taustasäikeessä."""
+    image = Image.open(path)
+    image.load()
+    return image, make_preview(image)
+
+
+def make_preview(image):
+    preview = image.copy()
+    preview.thumbnail(BackgroundScaler.PREVIEW_SIZE, Image.BILINEAR)
+    return preview
+
+
+class BackgroundScaler:
+    """Skaalaa taustakuvan ikkunan kokoon ilman että Tk-säie jumittuu.
+
+    Jokaisesta koonmuutoksesta näytetään heti nopea esikatselu pienestä
+    pikkukuvasta. Kun koonmuutokset ovat loppuneet `delay` ms ajaksi, tarkka
+    LANCZOS-skaalaus tehdään taustasäikeessä. Valmiit kuvat pidetään
+    koon mukaan LRU-välimuistissa, joten esim. fullscreen/ikkuna-vaihto
+    on välitön.
+    """
+
+    PREVIEW_SIZE = (480, 270)
+
+    def __init__(self, root, canvas, canvas_item, image, preview=None, cache_size=4, delay=150):
+        self.root = root
+        self.canvas = canvas
+        self.canvas_item = canvas_item
+        self.image = image
+        self.preview = preview if preview is not None else make_preview(image)
+        self.cache_size = cache_size
+        self.delay = delay
+
+        self.cache = collections.OrderedDict()
+        self.current_size = None
+        self.photo = None  # viite pitää tallessa, muuten Tk hävittää kuvan
+        self.pending = None
+        self.polling = None
+        self.generation = 0
+        self.in_flight = 0
+        self.results = queue.Queue()
+
+    def show(self, photo, size):
+        self.photo = photo
+        self.current_size = size
+        self.canvas.itemconfig(self.canvas_item, image=photo)
+
+    def store(self, size, photo):
+        self.cache[size] = photo
+        self.cache.move_to_end(size)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def request(self, width, height):
+        size = (width, height)
+        if size == self.current_size or width < 2 or height < 2:
+            return
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+
+        photo = self.cache.get(size)
+        if photo is not None:
+            self.cache.move_to_end(size)
+            # Mahdollinen kesken oleva skaalaus on nyt vanhentunut
+            self.generation += 1
+            self.show(photo, size)
+            return
+
+        self.show(ImageTk.PhotoImage(self.preview.resize(size, Image.BILINEAR)), size)
+        self.pending = self.root.after(self.delay, self.start_render, size)
+
+    def start_render(self, size):
+        self.pending = None
+        self.generation += 1
+        self.in_flight += 1
+        threading.Thread(target=self.render, args=(size, self.generation), daemon=True).start()
+        if self.polling is None:
+            self.polling = self.root.after(30, self.poll)
+
+    def close(self):
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+        if self.polling is not None:
+            self.root.after_cancel(self.polling)
+            self.polling = None
+
+    def render(self, size, generation):
+        # PIL vapauttaa GIL:n skaalauksen ajaksi, joten Tk pysyy responsiivisena
+        self.results.put((size, generation, self.image.resize(size, Image.LANCZOS)))
+
+    def poll(self):
+        self.polling = None
+        while True:
+            try:
+                size, generation, image = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.in_flight -= 1
+            photo = ImageTk.PhotoImage(image)
+            self.store(size, photo)
+            if generation == self.generation and size == self.current_size:
+                self.show(photo, size)
+        if self.in_flight:
+            self.polling = self.root.after(30, self.poll)
@@ -0,0 +1,57 @@
+class FontScaler:
+    """Skaalaa nimettyjä fontteja ikkunan koon mukaan.
+
+    Skaalauskerroin pyöristetään lähimpään STEPS-arvoon, ja fontit
+    päivitetään vasta kun koonmuutos on ollut `delay` ms paikallaan.
+    Jokaisen fontin config() pakottaa Tk:n asettelemaan kaikki sitä
+    käyttävät widgetit uudelleen, joten vain oikeasti muuttuneet koot
+    asetetaan. Koot ja fonttien metriikat lasketaan kerran per askel.
+    """
+
+    STEPS = (0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.15, 1.3, 1.5)
+
+    def __init__(self, root, delay=150, on_change=None):
+        self.root = root
+        self.delay = delay
+        self.on_change = on_change
+        self.fonts = {}  # nimi -> (fontti, peruskoko, minimikoko)
+        self.sizes = {}  # askel -> {nimi: koko}
+        self.metrics = {}  # askel -> {nimi: font.metrics()}
+        self.step = None
+        self.pending = None
+
+    def add(self, name, font, base_size, min_size):
+        self.fonts[name] = (font, base_size, min_size)
+        self.sizes = {step: self.sizes_for(step) for step in self.STEPS}
+
+    def sizes_for(self, step):
+        return {name: max(minimum, int(base * step))
+                for name, (_, base, minimum) in self.fonts.items()}
+
+    def quantize(self, scale):
+        return min(self.STEPS, key=lambda step: abs(step - scale))
+
+    def request(self, scale):
+        step = self.quantize(scale)
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+        if step != self.step:
+            self.pending = self.root.after(self.delay, self.apply, step)
+
+    def apply(self, step):
+        self.pending = None
+        if step == self.step:
+            return
+        for name, size in self.sizes[step].items():
+            font = self.fonts[name][0]
+            if font.cget("size") != size:
+                font.config(size=size)
+        self.step = step
+        if step not in self.metrics:
+            self.metrics[step] = {name: font.metrics() for name, (font, _, _) in self.fonts.items()}
+        if self.on_change is not None:
+            self.on_change(step)
+
+    def linespace(self, name):
+        return self.metrics[self.step][name]["linespace"]
@@ -1,98 +1,128 @@
 import tkinter as tk
 from tkinter import ttk
-import random
+import time
+from game import engine as rules
+from views.animation import AnimationClock
+from views.resources import RESOURCES, card_font_size
 # Jos haluat käyttää taustakuvaa, poista kommentit:
 # from PIL import Image, ImageTk
 
 class CardWidget(tk.Canvas):
-    def __init__(self, parent, text="", command=None, **kwargs):
+    # Fonttiolio per koko on yhteinen kaikille korteille ja ikkunoille
+    resources = RESOURCES
+
+    def __init__(self, parent, text="", command=None, clock=None, **kwargs):
         super().__init__(parent, highlightthickness=0, **kwargs)
         self.command = command
+        self.clock = clock if clock is not None else AnimationClock(self)
         self.text = text
+        self.rect_item = None
         self.text_item = None
+        self.image_item = None
+        self.sprite = None
         self.border_color = "black"
         self.bg_color = "white"
-        self.draw_card()
+        self.drawn_size = None
+        self.redraw_job = None
         self.bind("<Configure>", self.on_resize)
         self.bind("<Button-1>", self.on_click)
 
+    def get_font(self, size):
+        return self.resources.card_font(size)
+
+    def set_state(self, text=None, border_color=None, fill_color=None):
+        """Päivittää kortin tilan; piirto tehdään kerran seuraavalla idle-kierroksella."""
+        if text is not None:
+            self.text = text
+        if border_color is not None:
+            self.border_color = border_color
+        if fill_color is not None:
+            self.bg_color = fill_color
+        if self.redraw_job is None:
+            self.redraw_job = self.after_idle(self.draw_card)
+
+    def close(self):
+        self.clock.stop()
+        if self.redraw_job is not None:
+            self.after_cancel(self.redraw_job)
+            self.redraw_job = None
+
     def draw_card(self):
-        self.delete("all")
+        self.redraw_job = None
         w = self.winfo_width()
         h = self.winfo_height()
         if w < 10 or h < 10:
             return
-        m = int(min(w, h) * 0.05)
-        fs = max(10, int(h / 10))
-        self.create_rectangle(m, m, w - m, h - m, fill=self.bg_color,
-                              outline=self.border_color, width=3)
-        self.text_item = self.create_text(w/2, h/2, text=self.text,
-                                          font=("Helvetica", fs, "bold"),
-                                          fill="black",
-                                          width=w - m*2)
+        # Kortti on yksi valmiiksi piirretty kuva; vaihto on pelkkä itemconfig
+        sprite = self.resources.card_sprite(self.text, w, h, self.border_color, self.bg_color)
+        if sprite is None:
+            self.draw_primitives(w, h, card_font_size(h))
+            return
+        if self.image_item is None:
+            self.image_item = self.create_image(0, 0)
+        if self.drawn_size != (w, h):
+            self.coords(self.image_item, w / 2, h / 2)
+            self.drawn_size = (w, h)
+        if sprite is not self.sprite:
+            self.itemconfig(self.image_item, image=sprite)
+            self.sprite = sprite
+
+    def draw_primitives(self, w, h, fs):
+        # Ilman PILiä kortti piirretään canvasin suorakulmiosta ja tekstistä
+        if self.rect_item is None:
+            self.rect_item = self.create_rectangle(0, 0, 0, 0, width=3)
+            self.text_item = self.create_text(0, 0, fill="black")
+        if self.drawn_size != (w, h):
+            m = int(min(w, h) * 0.05)
+            self.coords(self.rect_item, m, m, w - m, h - m)
+            self.coords(self.text_item, w / 2, h / 2)
+            self.itemconfig(self.text_item, font=self.get_font(fs), width=w - m * 2)
+            self.drawn_size = (w, h)
+        self.itemconfig(self.rect_item, fill=self.bg_color, outline=self.border_color)
+        self.itemconfig(self.text_item, text=self.text)
 
     def update_text(self, text):
-        self.text = text
-        self.draw_card()
+        self.set_state(text=text)
 
     def update_border_color(self, color):
-        self.border_color = color
-        self.draw_card()
+        self.set_state(border_color=color)
         
     def update_fill_color(self, color):
-        self.bg_color = color
-        self.draw_card()
+        self.set_state(fill_color=color)
 
     def on_resize(self, event):
-        self.draw_card()
+        self.set_state()
 
     def on_click(self, event):
         if self.command:
             self.command()
 
     def flip_animation(self, final_text, steps=3, delay=100):
-        def animate(i):
-            if i < steps:
-                self.update_text("." * (i + 1))
-                self.after(delay, lambda: animate(i + 1))
-            else:
-                self.update_text(final_text)
-        animate(0)
+        frames = [(i * delay, lambda n=i + 1: self.update_text("." * n)) for i in range(steps)]
+        frames.append((steps * delay, lambda: self.update_text(final_text)))
+        self.clock.play((self, "text"), frames)
 
     def flash_card(self, flash_color="yellow", flash_duration=200):
+        # Edellinen välähdys ajetaan loppuun, ettei välähdysväri jää "alkuperäiseksi"
+        self.clock.finish((self, "border"))
         original_color = self.border_color
-        self.update_border_color(flash_color)
-        self.after(flash_duration, lambda: self.update_border_color(original_color))
+        self.clock.play((self, "border"), [
+            (0, lambda: self.update_border_color(flash_color)),
+            (flash_duration, lambda: self.update_border_color(original_color)),
+        ])
 
 
 class GameFrame(ttk.Frame):
     def __init__(self, parent, controller):
-        # Voit valita haluamasi ttk-teeman
-        style = ttk.Style()
-        style.theme_use("clam")  # esim. "clam", "default", "alt" jne.
-
-        # Määritellään mukautetut tyylit
-        style.configure("GameFrame.TFrame",
-                        background="#ADD8E6")  # vaaleansininen
-        style.configure("GameLabel.TLabel",
-                        background="#ADD8E6",
-                        foreground="#00008B",
-                        font=("Helvetica", 14, "bold"))
-        style.configure("GameButton.TButton",
-                        font=("Helvetica", 12, "bold"),
-                        foreground="white",
-                        padding=6)
-        style.map("GameButton.TButton",
-                  background=[("active", "#5F9EA0"), ("!disabled", "#4682B4")])
-
+        # GameFrame.TFrame-, GameLabel.TLabel- ja GameButton.TButton-tyylit
+        # määritellään kerran kaikille ikkunoille (views.resources)
         super().__init__(parent, style="GameFrame.TFrame")
         self.controller = controller
+        self.engine = controller.engine
 
         # Halutessasi taustakuva (kommentoi pois, jos et käytä)
         # self.set_background_image("path/to/your/background.png")
 
-        self.ITEM_CARDS = {"Shield", "Reveal Free", "Extra Life", "test1", "test2"}
-
         # Keskikehys (kaikki kortit ja pelaajateksti sen sisällä)
         self.center_frame = ttk.Frame(self, style="GameFrame.TFrame")
         self.center_frame.pack(expand=True, fill="both", padx=10, pady=10)
@@ -104,10 +134,12 @@ class GameFrame(ttk.Frame):
         self.card_frame = ttk.Frame(self.center_frame, style="GameFrame.TFrame")
         self.card_frame.pack(expand=True, fill="both")
 
+        self.animations = AnimationClock(self)
+        self.prefetch_job = None
         self.card_widgets = []
         for i in range(3):
             c = CardWidget(self.card_frame, text="", command=lambda idx=i: self.select_card(idx),
-                           bg="#FFFFFF")  # Canvasin taustaväri
+                           clock=self.animations, bg="#FFFFFF")  # Canvasin taustaväri
             c.grid(row=0, column=i, padx=10, pady=10, sticky="nsew")
             self.card_widgets.append(c)
         for i in range(3):
@@ -130,6 +162,9 @@ class GameFrame(ttk.Frame):
                                         style="GameButton.TButton")
         self.redraw_button.grid(row=0, column=1, padx=(10, 20))
 
+        # Kengän jäljellä olevat kortit, näkyy vain kun kenkä on käytössä
+        self.shoe_label = ttk.Label(self.penalty_frame, text="", background="#FFFACD")
+
         # Penalty-label
         self.penalty_label = ttk.Label(self.center_frame, text="",
                                        font=self.controller.label_font,
@@ -137,13 +172,14 @@ class GameFrame(ttk.Frame):
                                        foreground="red")
         self.penalty_label.place(relx=0.5, rely=0.1, anchor="center")
 
-        self.redraw_used = False
-
-        # Vuoron kortit
-        self.current_cards = []
-        self.hidden_index = None
-        self.revealed = []
-        self.ditto_active = [False, False, False]
+    def close(self):
+        """Peruu animaatiot ja odottavat piirrot; muut ikkunat jatkavat samassa juuressa."""
+        self.animations.stop()
+        for widget in self.card_widgets:
+            widget.close()
+        if self.prefetch_job is not None:
+            self.after_cancel(self.prefetch_job)
+            self.prefetch_job = None
 
     def set_background_image(self, image_path):
         """
@@ -165,117 +201,95 @@ class GameFrame(ttk.Frame):
         self.center_frame.lift()
 
     def roll_penalty(self):
-        p = self.controller.penalty_deck.draw_penalty_card()
+        p = self.engine.roll_penalty()
         if p:
-            self.controller.log_message(
-                f"{self.controller.players[self.controller.current_player_index]} rolled penalty card: {p}")
             self.penalty_label.config(text=p)
-            self.penalty_label.after(100, lambda: self.penalty_label.config(background="yellow"))
-            self.penalty_label.after(300, lambda: self.penalty_label.config(background="#FFFACD"))
+            self.animations.play("penalty_flash", [
+                (100, lambda: self.penalty_label.config(background="yellow")),
+                (300, lambda: self.penalty_label.config(background="#FFFACD")),
+            ], finish_previous=True)
         else:
             self.penalty_label.config(text="")
+        self.update_shoe_label()
 
-    def update_for_new_turn(self):
-        self.redraw_used = False
-        self.penalty_label.config(text="")
-
-        current_player = self.controller.players[self.controller.current_player_index]
-        self.turn_label.config(text=f"{current_player}'s Turn")
-
-        self.current_cards = self.controller.normal_deck.draw_cards(3)
-        for i in range(len(self.current_cards)):
-            if random.random() < 0.3:
-                self.current_cards[i] = random.choice(list(self.ITEM_CARDS))
-
-        self.hidden_index = random.randint(0, 2)
-        self.revealed = [True, True, True]
-        self.revealed[self.hidden_index] = False
-        self.ditto_active = [False, False, False]
-
-        for i, (widget, card_value) in enumerate(zip(self.card_widgets, self.current_cards)):
-            widget.update_border_color("black")
-            widget.update_fill_color("white")
-            if not self.revealed[i]:
-                widget.update_text("???")
-            else:
-                widget.update_text(card_value)
-            widget.bind("<Button-1>", lambda e, idx=i: self.select_card(idx))
-
-    def select_card(self, i):
-        for widget in self.card_widgets:
-            widget.unbind("<Button-1>")
-        current_player = self.controller.players[self.controller.current_player_index]
-
-        if not self.revealed[i]:
-            self.revealed[i] = True
-            self.card_widgets[i].flip_animation(self.current_cards[i])
-            self.card_widgets[i].bind("<Button-1>", lambda e, idx=i: self.select_card(idx))
+    def update_shoe_label(self):
+        penalty_left = self.engine.penalty_deck.cards_remaining()
+        if penalty_left is None:
+            self.shoe_label.grid_forget()
             return
+        text = f"Penalty shoe: {penalty_left} left"
+        hand_left = self.engine.normal_deck.cards_remaining()
+        if hand_left is not None:
+            text += f"\nHand shoe: {hand_left} left"
+        self.shoe_label.config(text=text)
+        self.shoe_label.grid(row=0, column=2, padx=(10, 20))
 
-        if self.ditto_active[i]:
-            self.controller.log_message(f"{current_player} confirmed Ditto card.")
-            self.card_widgets[i].unbind("<Button-1>")
-            self.card_widgets[i].update_fill_color("white")
-            self.card_widgets[i].update_border_color("black")
-            self.controller.next_player()
-            return
+    def update_for_new_turn(self):
+        self.engine.start_turn()
+        self.show_current_turn()
+
+    def show_current_turn(self):
+        """Näyttää enginen nykyisen vuoron jakamatta uusia kortteja (esim. jatkettaessa peliä)."""
+        self.animations.new_group()
+        self.penalty_label.config(text="", background="#FFFACD")
+        self.turn_label.config(text=f"{self.engine.current_player}'s Turn")
+        self.show_hand()
+        self.update_shoe_label()
+
+    def show_hand(self):
+        for i, widget in enumerate(self.card_widgets[:len(self.engine.current_cards)]):
+            widget.set_state(self.engine.card_face(i), "black", "white")
+        self.schedule_prefetch()
+
+    def schedule_prefetch(self):
+        # Seuraava käsi ja penaltynoston vaihtoehto jaetaan joutoaikana,
+        # jolloin klikkauksen jälkeen kädet vain vaihdetaan valmiisiin.
+        if self.prefetch_job is None:
+            self.prefetch_job = self.after_idle(self.prefetch_hands)
+
+    def prefetch_hands(self):
+        self.prefetch_job = None
+        with self.controller.perf.measure("prefetch_hands"):
+            self.engine.prefetch()
 
-        revealed_value = self.card_widgets[i].text
-        if revealed_value in self.ITEM_CARDS:
-            self.controller.log_message(f"{current_player} acquired item: {revealed_value}")
-            self.controller.add_item_to_player(current_player, revealed_value)
-            self.card_widgets[i].unbind("<Button-1>")
-            self.card_widgets[i].update_text("")
-            self.card_widgets[i].flash_card()
+    def select_card(self, i):
+        perf = self.controller.perf
+        clicked = time.perf_counter()
+        with perf.measure("select_card"):
+            self.apply_selection(i)
+        # Idle-jono on FIFO, joten tämä ajetaan vasta kun kortit on piirretty
+        self.after_idle(lambda: perf.record("click_to_paint", clicked, time.perf_counter() - clicked))
+
+    def apply_selection(self, i):
+        outcome = self.engine.select_card(i)
+        widget = self.card_widgets[i]
+        if outcome is not None:
+            # Kesken oleva kääntö kirjoittaisi muuten kortin nimen tuloksen päälle
+            self.animations.cancel((widget, "text"))
+
+        if outcome == rules.REVEALED:
+            widget.flip_animation(self.engine.current_cards[i])
+        elif outcome == rules.DITTO:
+            widget.set_state("Ditto", "purple", "#E6E6FA")
+        elif outcome == rules.DITTO_CONFIRMED:
+            widget.set_state(border_color="black", fill_color="white")
+        elif outcome == rules.ITEM:
+            widget.update_text("")
+            widget.flash_card()
+        elif outcome == rules.SELECTED:
+            widget.flash_card()
+
+        if outcome in rules.TURN_ENDING:
             self.controller.next_player()
-            return
-
-        # Ditto-efekti 25 % todennäköisyydellä
-        if random.random() < 0.25:
-            self.ditto_active[i] = True
-            self.card_widgets[i].update_text("Ditto")
-            self.card_widgets[i].update_border_color("purple")
-            self.card_widgets[i].update_fill_color("#E6E6FA")
-            self.controller.log_message("Ditto effect activated! Click again to confirm.")
-            self.card_widgets[i].bind("<Button-1>", lambda e, idx=i: self.select_card(idx))
-            return
-
-        # Normaali kortin valinta
-        self.controller.log_message(f"{current_player} selected {revealed_value}")
-        self.card_widgets[i].flash_card()
-        self.controller.next_player()
 
     def redraw_penalty(self):
-        if self.redraw_used:
-            self.controller.log_message("Redraw is already used this turn.")
+        ok, p = self.engine.redraw_penalty()
+        if not ok:
             return
-
-        p = self.controller.penalty_deck.draw_penalty_card()
-        if p:
-            self.controller.log_message(
-                f"{self.controller.players[self.controller.current_player_index]} drew penalty card: {p}")
-            self.penalty_label.config(text=p)
-        else:
-            self.penalty_label.config(text="")
-
-        self.current_cards = self.controller.normal_deck.draw_cards(3)
-        for i in range(len(self.current_cards)):
-            if random.random() < 0.3:
-                self.current_cards[i] = random.choice(list(self.ITEM_CARDS))
-        self.hidden_index = random.randint(0, 2)
-        self.revealed = [True, True, True]
-        self.revealed[self.hidden_index] = False
-        self.ditto_active = [False, False, False]
-
-        for i, (widget, card_value) in enumerate(zip(self.card_widgets, self.current_cards)):
-            widget.update_border_color("black")
-            widget.update_fill_color("white")
-            if not self.revealed[i]:
-                widget.update_text("???")
-            else:
-                widget.update_text(card_value)
-            widget.bind("<Button-1>", lambda e, idx=i: self.select_card(idx))
-        self.redraw_used = True
+        self.animations.new_group()
+        self.penalty_label.config(text=p or "", background="#FFFACD")
+        self.show_hand()
+        self.update_shoe_label()
 
     def handle_crowd_challenge(self):
-        self.controller.log_message("Crowd Challenge triggered! All players must do something special!")
+        self.engine.crowd_challenge()
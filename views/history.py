@@ -0,0 +1,70 @@
+import sys
+import tkinter as tk
+
+
+class HistoryView:
+    """Card History -tekstikenttä, johon viestit kirjoitetaan erissä.
+
+    log() vain lisää viestin jonoon; jono puretaan kerran ruudunpäivityksessä
+    (noin 60 Hz). Tekstikentässä pidetään enintään `max_lines` riviä, joten
+    lisäykset eivät hidastu pitkän illan aikana. Jos `sink` on annettu,
+    koko historia välitetään myös sille (esim. HistoryFileSink).
+    """
+
+    FRAME_MS = 16
+
+    def __init__(self, text_widget, max_lines=500, sink=None, echo=True, perf=None):
+        self.text = text_widget
+        self.perf = perf
+        self.max_lines = max_lines
+        self.sink = sink
+        self.echo = echo
+        self.pending = []
+        self.flush_job = None
+        self.line_count = 0
+
+    def log(self, message):
+        self.pending.append(message)
+        if self.flush_job is None:
+            self.flush_job = self.text.after(self.FRAME_MS, self.flush)
+
+    def flush(self):
+        self.flush_job = None
+        if not self.pending:
+            return
+        if self.perf is not None:
+            with self.perf.measure("history_flush"):
+                self.write_pending()
+        else:
+            self.write_pending()
+
+    def write_pending(self):
+        messages = self.pending
+        self.pending = []
+        if len(messages) > self.max_lines:
+            shown = messages[-self.max_lines:]
+        else:
+            shown = messages
+
+        self.text.config(state='normal')
+        self.text.insert(tk.END, "\n".join(shown) + "\n")
+        self.line_count += len(shown)
+        excess = self.line_count - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.line_count = self.max_lines
+        self.text.config(state='disabled')
+        self.text.see(tk.END)
+
+        if self.sink is not None:
+            self.sink.write(messages)
+        if self.echo:
+            sys.stdout.write("\n".join(messages) + "\n")
+
+    def close(self):
+        if self.flush_job is not None:
+            self.text.after_cancel(self.flush_job)
+            self.flush_job = None
+        self.flush()
+        if self.sink is not None:
+            self.sink.close()
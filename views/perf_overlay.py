@@ -0,0 +1,60 @@
+import time
+import tkinter as tk
+
+
+class PerfOverlay:
+    """Näytön päälle piirrettävä suorituskykypaneeli (F3 päälle/pois).
+
+    Mittaa myös Tk:n tapahtumajonon viivettä: after()-ajastin pyydetään
+    `probe_ms` välein, ja se, kuinka paljon myöhässä se laukeaa, kirjataan
+    nimellä "event_lag".
+    """
+
+    def __init__(self, root, monitor, refresh_ms=500, probe_ms=100):
+        self.root = root
+        self.monitor = monitor
+        self.refresh_ms = refresh_ms
+        self.probe_ms = probe_ms
+        self.visible = False
+        self.refresh_job = None
+        self.label = tk.Label(root, justify="left", anchor="nw", font=("Courier", 10),
+                              background="#202020", foreground="#00FF00")
+        self.expected = time.perf_counter() + probe_ms / 1000
+        self.probe_job = root.after(probe_ms, self.probe)
+
+    def probe(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self.expected)
+        self.monitor.record("event_lag", self.expected, lag)
+        self.expected = now + self.probe_ms / 1000
+        self.probe_job = self.root.after(self.probe_ms, self.probe)
+
+    def close(self):
+        self.visible = False
+        self.cancel_refresh()
+        if self.probe_job is not None:
+            self.root.after_cancel(self.probe_job)
+            self.probe_job = None
+
+    def toggle(self, event=None):
+        self.visible = not self.visible
+        if self.visible:
+            self.label.place(x=5, y=5)
+            self.label.lift()
+            self.refresh()
+        else:
+            self.cancel_refresh()
+            self.label.place_forget()
+
+    def cancel_refresh(self):
+        # Muuten nopea F3-painelu jättäisi useita päivityssilmukoita käyntiin
+        if self.refresh_job is not None:
+            self.root.after_cancel(self.refresh_job)
+            self.refresh_job = None
+
+    def refresh(self):
+        self.refresh_job = None
+        if not self.visible:
+            return
+        self.label.config(text="\n".join(self.monitor.summary()) or "no measurements yet")
+        self.refresh_job = self.root.after(self.refresh_ms, self.refresh)
@@ -32,4 +32,4 @@ class PlayerSetupFrame(ttk.Frame):
     def start_game(self):
         if self.controller.players:
             self.controller.show_frame("GameFrame")
-            self.controller.frames["GameFrame"].update_for_new_turn()
+            self.controller.get_frame("GameFrame").update_for_new_turn()
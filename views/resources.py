@@ -0,0 +1,178 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkFont
+
+from views.fonts import FontScaler
+
+
+def card_font_size(height):
+    """Korttitekstin pistekoko kortin korkeudesta."""
+    return max(10, int(height / 10))
+
+
+class ResourceRegistry:
+    """Prosessin yhteiset Tk-resurssit kaikille peli-ikkunoille.
+
+    Fontit, ttk-teema ja kuvat kuuluvat Tcl-tulkille, joten ikkunat ovat
+    yhden piilotetun Tk-juuren Toplevel-ikkunoita. Juuri, fontit ja teema
+    luodaan ensimmäisen ikkunan acquire()-kutsussa ja tuhotaan, kun
+    viimeinen ikkuna kutsuu release(). Purettu taustakuva on samoin
+    viitelaskettu polun mukaan: sama kuva puretaan kerran, vaikka sitä
+    pyytäisi moni ikkuna.
+    """
+
+    # nimi -> (peruskoko, minimikoko, paksuus)
+    FONTS = {
+        "label": (20, 10, "bold"),
+        "sub_label": (18, 10, "normal"),
+        "button": (16, 8, "normal"),
+        "entry": (16, 8, "normal"),
+        "tree": (16, 8, "normal"),
+        "text": (16, 8, "normal"),
+    }
+
+    def __init__(self):
+        self.root = None
+        self.windows = 0
+        self.fonts = {}
+        self.card_fonts = {}  # koko -> lihavoitu fontti korttien tekstille
+        self.sprites = None  # SpriteCache, False jos PIL puuttuu
+        self.font_scaler = None
+        self.style = None
+        self.images = {}  # polku -> [viitteet, tulos tai None, odottavat callbackit]
+        self.decoded = queue.Queue()
+        self.polling = False
+
+    def acquire(self):
+        """Palauttaa yhteisen Tk-juuren ja kasvattaa ikkunoiden viitemäärää."""
+        if self.root is None:
+            self.root = tk.Tk()
+            self.root.withdraw()
+            self.create_fonts()
+            self.create_style()
+        self.windows += 1
+        return self.root
+
+    def release(self):
+        self.windows -= 1
+        if self.windows > 0:
+            return
+        root = self.root
+        self.root = None
+        self.fonts = {}
+        self.card_fonts = {}
+        self.sprites = None
+        self.font_scaler = None
+        self.style = None
+        self.images.clear()
+        self.polling = False
+        root.destroy()
+
+    def create_fonts(self):
+        self.font_scaler = FontScaler(self.root, on_change=self.on_fonts_scaled)
+        for name, (size, minimum, weight) in self.FONTS.items():
+            font = tkFont.Font(self.root, family="Helvetica", size=size, weight=weight)
+            self.fonts[name] = font
+            self.font_scaler.add(name, font, size, minimum)
+
+    def card_font(self, size):
+        font = self.card_fonts.get(size)
+        if font is None:
+            font = tkFont.Font(self.root, family="Helvetica", size=size, weight="bold")
+            self.card_fonts[size] = font
+        return font
+
+    def card_sprite(self, text, width, height, border, fill):
+        """Valmiiksi piirretty korttikuva (views.sprites), tai None ilman PILiä."""
+        if self.sprites is None:
+            try:
+                from views.sprites import SpriteCache
+            except ImportError:
+                self.sprites = False
+            else:
+                self.sprites = SpriteCache(self.root)
+        if not self.sprites:
+            return None
+        return self.sprites.get(text, width, height, border, fill)
+
+    def create_style(self):
+        # theme_use muotoilee kaikki widgetit uudelleen, joten se tehdään vain kerran
+        style = self.style = ttk.Style(self.root)
+        style.theme_use("clam")
+        style.configure("TFrame", background="#f0f0f0")
+        style.configure("TButton", font=self.fonts["button"])
+        style.configure("Accent.TButton", font=self.fonts["button"], foreground="blue")
+        style.configure("TLabel", font=self.fonts["label"], background="#f0f0f0")
+        style.configure("Treeview", font=self.fonts["tree"])
+        style.configure("Treeview.Heading", font=self.fonts["tree"])
+        # Pelinäkymän tyylit
+        style.configure("GameFrame.TFrame", background="#ADD8E6")  # vaaleansininen
+        style.configure("GameLabel.TLabel", background="#ADD8E6", foreground="#00008B",
+                        font=("Helvetica", 14, "bold"))
+        style.configure("GameButton.TButton", font=("Helvetica", 12, "bold"),
+                        foreground="white", padding=6)
+        style.map("GameButton.TButton",
+                  background=[("active", "#5F9EA0"), ("!disabled", "#4682B4")])
+
+    def on_fonts_scaled(self, step):
+        # ttk.Treeview ei kasvata rivikorkeutta fontin mukana itse
+        self.style.configure("Treeview", rowheight=self.font_scaler.linespace("tree") + 4)
+
+    def acquire_image(self, path, callback):
+        """Kutsuu callback((kuva, esikatselu)) tai callback(virhe) Tk-säikeessä."""
+        entry = self.images.get(path)
+        if entry is None:
+            entry = self.images[path] = [0, None, []]
+            # Kuvan purku tehdään taustasäikeessä; Tk-olioita luodaan vain pääsäikeessä
+            threading.Thread(target=self.decode_image, args=(path,), daemon=True).start()
+            if not self.polling:
+                self.polling = True
+                self.root.after(50, self.poll_images)
+        entry[0] += 1
+        if entry[1] is not None:
+            self.root.after_idle(callback, entry[1])
+        else:
+            entry[2].append(callback)
+
+    def release_image(self, path, callback=None):
+        entry = self.images.get(path)
+        if entry is None:
+            return
+        if callback in entry[2]:
+            entry[2].remove(callback)
+        entry[0] -= 1
+        if entry[0] <= 0:
+            del self.images[path]
+
+    def decode_image(self, path):
+        try:
+            from views.background import decode_background
+            self.decoded.put((path, decode_background(path)))
+        except Exception as e:
+            self.decoded.put((path, e))
+
+    def poll_images(self):
+        self.polling = False
+        if self.root is None:
+            return
+        try:
+            path, result = self.decoded.get_nowait()
+        except queue.Empty:
+            self.polling = True
+            self.root.after(50, self.poll_images)
+            return
+        entry = self.images.get(path)
+        if entry is not None:
+            entry[1] = result
+            callbacks, entry[2] = entry[2], []
+            for callback in callbacks:
+                callback(result)
+        if any(entry[1] is None for entry in self.images.values()):
+            self.polling = True
+            self.root.after(50, self.poll_images)
+
+
+# Prosessin yhteinen rekisteri
+RESOURCES = ResourceRegistry()
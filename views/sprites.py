@@ -0,0 +1,108 @@
+import collections
+
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+
+from views.resources import card_font_size
+
+# Lihavoitu fontti korttien tekstille; ensimmäinen löytyvä käytetään
+FONT_FILES = ("arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf")
+
+
+def load_font(pixels):
+    for name in FONT_FILES:
+        try:
+            return ImageFont.truetype(name, pixels)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(pixels)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def wrap_text(text, font, width):
+    """Rivittää tekstin sanoittain annettuun leveyteen (kuten canvas-tekstin width)."""
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if line and font.getlength(candidate) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def render_card(size, text, border, fill, font, margin, border_width=3):
+    """Piirtää kortin kuvaksi: kehys, täyttö ja keskitetty teksti läpinäkyvällä reunalla."""
+    w, h = size
+    image = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((margin, margin, w - margin - 1, h - margin - 1),
+                   fill=fill, outline=border, width=border_width)
+    if text:
+        lines = wrap_text(text, font, w - margin * 2)
+        ascent, descent = font.getmetrics()
+        line_height = ascent + descent
+        y = (h - line_height * len(lines)) / 2
+        for line in lines:
+            draw.text(((w - font.getlength(line)) / 2, y), line, fill="black", font=font)
+            y += line_height
+    return image
+
+
+class SpriteCache:
+    """Valmiiksi piirretyt korttikuvat avaimella (teksti, kokolokero, kehys, täyttö).
+
+    Kortin koko pyöristetään alaspäin `bucket` pikselin lokeroon, ja
+    fonttikoko lasketaan lokeron korkeudesta, joten ikkunan pieni
+    koonmuutos ei piirrä kaikkea uudelleen. Kuvat pidetään
+    LRU-järjestyksessä, ja vanhimmat poistetaan, kun kuvien yhteinen
+    pinta-ala ylittää `max_pixels` (Tk pitää kuvaa 4 tavuna pikseliltä).
+    """
+
+    def __init__(self, root, max_pixels=16_000_000, bucket=32):
+        self.root = root
+        self.point = root.winfo_fpixels("1p")  # pikseleitä per piste
+        self.max_pixels = max_pixels
+        self.bucket = bucket
+        self.sprites = collections.OrderedDict()
+        self.pixels = 0
+        self.fonts = {}  # pistekoko -> PIL-fontti
+        self.colors = {}  # Tk:n värinimi -> RGB
+        self.rendered = 0
+
+    def bucket_size(self, width, height):
+        b = self.bucket
+        return max(b, width // b * b), max(b, height // b * b)
+
+    def rgb(self, color):
+        rgb = self.colors.get(color)
+        if rgb is None:
+            rgb = self.colors[color] = tuple(c >> 8 for c in self.root.winfo_rgb(color))
+        return rgb
+
+    def get(self, text, width, height, border, fill):
+        size = self.bucket_size(width, height)
+        key = (text, size, border, fill)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        font_size = card_font_size(size[1])
+        font = self.fonts.get(font_size)
+        if font is None:
+            font = self.fonts[font_size] = load_font(round(font_size * self.point))
+        margin = int(min(size) * 0.05)
+        image = render_card(size, text, self.rgb(border), self.rgb(fill), font, margin)
+        sprite = ImageTk.PhotoImage(image, master=self.root)
+        self.rendered += 1
+        self.sprites[key] = sprite
+        self.pixels += size[0] * size[1]
+        while self.pixels > self.max_pixels and len(self.sprites) > 1:
+            (_, (w, h), _, _), _ = self.sprites.popitem(last=False)
+            self.pixels -= w * h
+        return sprite